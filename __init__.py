@@ -1,3 +1,4 @@
+from . import controllers
 from . import models
 
 def post_init_hook(cr, registry):
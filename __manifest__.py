@@ -1,6 +1,6 @@
 {
     'name': 'Capstone_Simple Change Request',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.1.0',
     'summary': 'Simple Change Request Management System',
     'description': '''
         Simple Change Request Management System with Word Export
@@ -17,13 +17,24 @@
     'author': 'Your Organization',
     'website': 'https://www.yourwebsite.com',
     'category': 'Project Management',
-    'depends': ['base'],
+    'depends': ['base', 'bus'],
     'data': [
         'security/ir.model.access.csv',
+        'security/change_request_export_job_rules.xml',
         'data/sequence_data.xml',
+        'data/ir_cron_data.xml',
         'views/simple_change_request_views.xml',
         'views/change_request_effort_line_views.xml',
         'views/change_request_export_wizard_views.xml',
+        'views/change_request_template_views.xml',
+        'views/change_request_export_job_views.xml',
+        'views/change_request_project_views.xml',
+        'views/change_request_effort_import_wizard_views.xml',
+        'views/change_request_export_stat_views.xml',
+        'views/change_request_archive_views.xml',
+        'views/change_request_effort_report_views.xml',
+        'views/change_request_register_export_wizard_views.xml',
+        'views/change_request_revision_views.xml',
     ],
     'demo': [
         'data/demo_data.xml',
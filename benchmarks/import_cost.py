@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Import cost of the change request module.
+
+Imports the module in fresh interpreters, as a worker loading the registry
+does, and reports the time and resident memory it takes, which heavy export
+libraries it pulled in, and what loading the export backends costs on top
+(paid only by processes that actually export)::
+
+    python3 benchmarks/import_cost.py -c /etc/odoo.conf --repeat 5 --output import.json
+
+No database is needed.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+# Libraries only the export backends need
+EXPORT_LIBRARIES = ['docx', 'docxtpl', 'jinja2', 'openpyxl']
+
+PROBE = r"""
+import json, resource, sys, time
+import odoo
+from odoo.modules.module import initialize_sys_path, load_openerp_module
+from odoo.tools import config
+
+config_file, module, load_backends, libraries = json.loads(sys.argv[1])
+config.parse_config(['-c', config_file] if config_file else [])
+initialize_sys_path()
+
+def rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def new_libraries(loaded):
+    return sorted(name for name in libraries if name in sys.modules and name not in loaded)
+
+result = {}
+loaded = {name for name in libraries if name in sys.modules}
+rss_before, start = rss(), time.perf_counter()
+load_openerp_module(module)
+result['module_seconds'] = time.perf_counter() - start
+result['module_rss_kb'] = rss() - rss_before
+result['module_libraries'] = new_libraries(loaded)
+
+if load_backends:
+    backends = sys.modules[f'odoo.addons.{module}.tools.export_backends']
+    loaded = {name for name in libraries if name in sys.modules}
+    rss_before, start = rss(), time.perf_counter()
+    for name in backends.BACKENDS:
+        backends.get_backend(name)
+    result['backends_seconds'] = time.perf_counter() - start
+    result['backends_rss_kb'] = rss() - rss_before
+    result['backends_libraries'] = new_libraries(loaded)
+
+print(json.dumps(result))
+"""
+
+
+def probe(config_file, module, load_backends):
+    """Import the module in a fresh interpreter and return its measurements"""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, json.dumps([config_file, module, load_backends, EXPORT_LIBRARIES])],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(samples, key):
+    values = [sample[key] for sample in samples]
+    return {'median': statistics.median(values), 'min': min(values), 'max': max(values)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-c', '--config', help="Odoo configuration file (for the addons path)")
+    parser.add_argument('--module', default=os.path.basename(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                        help="Technical name of the module (default: its directory name)")
+    parser.add_argument('--repeat', type=int, default=5, help="Number of fresh interpreters per measurement")
+    parser.add_argument('--output', help="Write the results to this JSON file instead of stdout")
+    args = parser.parse_args()
+
+    samples = [probe(args.config, args.module, True) for _dummy in range(args.repeat)]
+    results = {
+        'python': platform.python_version(),
+        'module': args.module,
+        'repeat': args.repeat,
+        'module_import': {
+            'seconds': summarize(samples, 'module_seconds'),
+            'rss_kb': summarize(samples, 'module_rss_kb'),
+            'libraries': samples[0]['module_libraries'],
+        },
+        'backends_load': {
+            'seconds': summarize(samples, 'backends_seconds'),
+            'rss_kb': summarize(samples, 'backends_rss_kb'),
+            'libraries': samples[0]['backends_libraries'],
+        },
+    }
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(payload)
+    else:
+        print(payload)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""Scale benchmark of the change request module.
+
+Seeds N change requests with M effort lines each in a local database, times
+the module's real entry points and writes the results as JSON, so that two
+versions of the module can be compared number by number::
+
+    python3 benchmarks/scale_benchmark.py -c /etc/odoo.conf -d bench_db \\
+        --requests 1000 --lines 20 --seed 42 --output bench.json
+
+The module must be installed in the database. Everything runs in a single
+transaction that is rolled back at the end: the database is left untouched.
+"""
+import argparse
+import base64
+import json
+import platform
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import odoo
+from odoo import api, SUPERUSER_ID
+from odoo.tools import config
+
+MODULE_MODEL = 'simple.change.request'
+
+DEPARTMENTS = ['IT Department', 'Finance', 'Operations', 'Human Resources', 'Sales', 'Legal']
+PROJECTS = ['ERP Rollout', 'Network Refresh', 'Data Warehouse', 'Customer Portal', 'Compliance 2026']
+STATE_SPREAD = [('draft', 0.3), ('submitted', 0.25), ('approved', 0.2), ('rejected', 0.1), ('completed', 0.15)]
+PARAGRAPH = (
+    "The current process relies on manual steps that delay delivery and "
+    "introduce errors. This change streamlines the workflow and adds controls. "
+)
+
+
+class Benchmark:
+    """Collects the duration and query count of timed sections"""
+
+    def __init__(self, env):
+        self.env = env
+        self.results = []
+
+    @contextmanager
+    def measure(self, name, records=0):
+        cr = self.env.cr
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries = cr.sql_log_count
+        start = time.perf_counter()
+        yield
+        self.env.flush_all()
+        elapsed = time.perf_counter() - start
+        result = {
+            'name': name,
+            'records': records,
+            'seconds': round(elapsed, 6),
+            'queries': cr.sql_log_count - queries,
+        }
+        if records:
+            result['ms_per_record'] = round(1000 * elapsed / records, 4)
+        self.results.append(result)
+        print(f"{name:<45} {elapsed:>10.3f}s {result['queries']:>8} queries", file=sys.stderr)
+
+
+def generate_values(env, requests, lines, rng):
+    """Seeded create values for ``requests`` change requests of ``lines`` effort lines"""
+    projects = env['change.request.project']._get_or_create_by_name(PROJECTS)
+    categories = [key for key, _label in env['change.request.effort.line']._fields['task_category'].selection]
+    request_types = [key for key, _label in env[MODULE_MODEL]._fields['request_type'].selection]
+    priorities = [key for key, _label in env[MODULE_MODEL]._fields['priority'].selection]
+    today = date.today()
+
+    vals_list = []
+    for index in range(requests):
+        vals_list.append({
+            'name': f"Benchmark change request {index:07d}",
+            'project_id': projects[rng.choice(PROJECTS)].id,
+            'department': rng.choice(DEPARTMENTS),
+            'request_type': rng.choice(request_types),
+            'priority': rng.choice(priorities),
+            'expected_completion': today + timedelta(days=rng.randint(1, 365)),
+            'problem_statement': PARAGRAPH * rng.randint(1, 5),
+            'change_description': ''.join(f"<p>{PARAGRAPH}</p>" for _dummy in range(rng.randint(1, 5))),
+            'acceptance_criteria': PARAGRAPH,
+            'reason_for_change': PARAGRAPH,
+            'benefits_of_change': PARAGRAPH,
+            'cost_estimation': f"Total: ${rng.randint(1, 500) * 1000:,}",
+            'effort_breakdown_ids': [odoo.Command.create({
+                'task_number': str(line + 1),
+                'expected_task': f"Task {line + 1}: {PARAGRAPH[:60]}",
+                'effort_days': rng.randint(1, 40) / 2,
+                'task_category': rng.choice(categories),
+            }) for line in range(lines)],
+        })
+    return vals_list
+
+
+def assign_states(records, rng):
+    """Target state of each record, following STATE_SPREAD"""
+    states, weights = zip(*STATE_SPREAD)
+    return {record: rng.choices(states, weights)[0] for record in records}
+
+
+def make_template():
+    """A small docxtpl template using most variables and the effort loop"""
+    from io import BytesIO
+    from docx import Document
+
+    document = Document()
+    document.add_heading('{{ change_number }} - {{ project_name }}', 0)
+    for variable in ('requester_name', 'priority', 'problem_statement', 'acceptance_criteria'):
+        document.add_paragraph(f'{variable}: {{{{ {variable} }}}}')
+    document.add_paragraph('{{p change_description }}')
+    document.add_paragraph('{%p for line in effort_breakdown %}')
+    document.add_paragraph('{{ line.task_number }} {{ line.expected_task }} {{ line.effort_days }}')
+    document.add_paragraph('{%p endfor %}')
+    output = BytesIO()
+    document.save(output)
+    return output.getvalue()
+
+
+def run(env, requests, lines, seed, sample):
+    rng = random.Random(seed)
+    bench = Benchmark(env)
+    Request = env[MODULE_MODEL]
+
+    vals_list = generate_values(env, requests, lines, rng)
+    with bench.measure('create', requests):
+        records = Request.create(vals_list)
+
+    # Workflow transitions, one bulk call per step as the list actions do
+    targets = assign_states(records, rng)
+    to_submit = records.filtered(lambda r: targets[r] != 'draft')
+    with bench.measure('action_submit', len(to_submit)):
+        to_submit.action_submit()
+    to_reject = to_submit.filtered(lambda r: targets[r] == 'rejected')
+    with bench.measure('action_reject', len(to_reject)):
+        to_reject.action_reject()
+    to_approve = to_submit.filtered(lambda r: targets[r] in ('approved', 'completed'))
+    with bench.measure('action_approve', len(to_approve)):
+        to_approve.action_approve()
+    to_complete = to_approve.filtered(lambda r: targets[r] == 'completed')
+    with bench.measure('action_complete', len(to_complete)):
+        to_complete.action_complete()
+    to_reset = to_reject[:max(1, len(to_reject) // 10)]
+    with bench.measure('action_reset_to_draft', len(to_reset)):
+        to_reset.action_reset_to_draft()
+
+    # List and kanban views
+    list_spec = {fname: {} for fname in (
+        'name', 'change_number', 'department', 'priority', 'request_type',
+        'total_effort_days', 'expected_completion', 'state',
+    )}
+    list_spec['project_id'] = {'fields': {'display_name': {}}}
+    list_spec['requester_id'] = {'fields': {'display_name': {}}}
+    with bench.measure('web_search_read (list, 80 rows)', 80):
+        Request.web_search_read([], list_spec, limit=80)
+    with bench.measure('web_search_read (list, last page)', 80):
+        Request.web_search_read([], list_spec, offset=max(0, requests - 80), limit=80)
+    with bench.measure('read_group (kanban by state)'):
+        Request.read_group([], ['total_effort_days:sum'], ['state'])
+    with bench.measure('read_group (by project and priority)'):
+        Request.read_group([], ['total_effort_days:sum'], ['project_id', 'priority'], lazy=False)
+    with bench.measure('name_search', 1):
+        Request.name_search('Benchmark change request 00001', limit=8)
+
+    # Template contexts and exports, on a sample of the records
+    sampled = records[:sample]
+    with bench.measure('_iter_template_contexts', len(sampled)):
+        for _record, _context in sampled._iter_template_contexts():
+            pass
+
+    Wizard = env['change.request.export.wizard']
+    with bench.measure('export basic document', len(sampled)):
+        for record in sampled:
+            Wizard.create({'change_request_id': record.id})._export_attachment()
+
+    template = env['change.request.template'].create({
+        'name': 'Benchmark template',
+        'template_file': base64.b64encode(make_template()),
+        'template_filename': 'benchmark.docx',
+    })
+    with bench.measure('export template document', len(sampled)):
+        for record in sampled:
+            Wizard.create({'change_request_id': record.id, 'template_id': template.id})._export_attachment()
+    with bench.measure('export template document (cached)', len(sampled)):
+        for record in sampled:
+            Wizard.create({'change_request_id': record.id, 'template_id': template.id})._export_attachment()
+    with bench.measure('export batch ZIP (template)', len(sampled)):
+        Wizard.create({
+            'export_mode': 'batch',
+            'change_request_ids': [odoo.Command.set(sampled.ids)],
+            'template_id': template.id,
+            'output_filename': 'Bench_{}.docx',
+        })._export_attachment()
+
+    return bench.results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-c', '--config', help="Odoo configuration file")
+    parser.add_argument('-d', '--database', required=True, help="Database with the module installed")
+    parser.add_argument('--requests', type=int, default=1000, help="Number of change requests to generate")
+    parser.add_argument('--lines', type=int, default=10, help="Effort lines per change request")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed of the generator")
+    parser.add_argument('--sample', type=int, default=50, help="Records used by the export benchmarks")
+    parser.add_argument('--output', help="JSON output file (default: stdout)")
+    args = parser.parse_args()
+
+    config.parse_config(['-c', args.config] if args.config else [])
+    registry = odoo.modules.registry.Registry(args.database)
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        module = env['ir.module.module'].search([('name', '=', env[MODULE_MODEL]._module)])
+        module_version = module.latest_version
+        try:
+            results = run(env, args.requests, args.lines, args.seed, min(args.sample, args.requests))
+        finally:
+            cr.rollback()
+
+    report = {
+        'parameters': {
+            'requests': args.requests,
+            'lines': args.lines,
+            'seed': args.seed,
+            'sample': min(args.sample, args.requests),
+        },
+        'environment': {
+            'module_version': module_version,
+            'odoo_version': odoo.release.version,
+            'python_version': platform.python_version(),
+            'machine': platform.machine(),
+        },
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+from . import change_request_api
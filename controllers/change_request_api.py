@@ -0,0 +1,202 @@
+import base64
+import binascii
+import hashlib
+import json
+from datetime import datetime
+
+from odoo import api, http
+from odoo.exceptions import UserError
+from odoo.http import request
+from odoo.tools import SQL
+
+from ..tools.api_values import (
+    CHANGE_REQUEST_FIELDS, DEFAULT_CHANGE_REQUEST_FIELDS, EFFORT_LINE_FIELDS, serialize_record,
+)
+
+# Page size of the read API, by default and at most
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class ApiError(Exception):
+    """Invalid request parameter, answered with a 400 response"""
+
+
+def _encode_cursor(write_date, record_id):
+    payload = json.dumps([write_date.isoformat(), record_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        write_date, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(write_date), int(record_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise ApiError("Invalid cursor.")
+
+
+def _parse_fields(value, allowed, default):
+    if not value:
+        return list(default)
+    fnames = [fname.strip() for fname in value.split(',') if fname.strip()]
+    unknown = set(fnames) - set(allowed)
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(sorted(unknown))}. Available fields: {', '.join(allowed)}")
+    return fnames
+
+
+def _parse_limit(value):
+    try:
+        limit = int(value) if value else DEFAULT_PAGE_SIZE
+    except ValueError:
+        raise ApiError("Invalid limit.")
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _keyset_page(model, domain, cursor, limit):
+    """``(id, write_date)`` of the next page of records, in ``(write_date, id)``
+    order after ``cursor``, read through the (write_date, id) index.
+
+    Like the change feed, pages stop at its horizon: write dates are the
+    start time of their transaction, and a cursor past rows not committed
+    yet would skip them for good.
+    """
+    query = model._search(domain)
+    write_date = SQL.identifier(model._table, 'write_date')
+    record_id = SQL.identifier(model._table, 'id')
+    query.add_where(SQL("%s < %s", write_date, model.env['simple.change.request']._get_feed_horizon()))
+    if cursor:
+        after_date, after_id = _decode_cursor(cursor)
+        query.add_where(SQL("(%s, %s) > (%s, %s)", write_date, record_id, after_date, after_id))
+    query.order = SQL("%s, %s", write_date, record_id)
+    query.limit = limit
+    return model.env.execute_query(query.select(record_id, write_date))
+
+
+class ChangeRequestApi(http.Controller):
+    """Read-only JSON API for dashboards.
+
+    Pages are read with keyset pagination on ``(write_date, id)``: a page
+    costs the same wherever it is, and polling with the last ``next_cursor``
+    only returns the records changed since (a minute after their change at
+    the earliest, once no transaction still running can add older ones). Every page carries an ETag
+    computed from the ids and write dates alone, so a page that didn't
+    change is answered 304 before any of its fields is read.
+    """
+
+    @http.route('/simple_change_request/api/change_requests', type='http', auth='user', methods=['GET'],
+                readonly=True)
+    def change_requests(self, cursor=None, limit=None, fields=None, lines=None, line_fields=None, state=None,
+                        project_id=None, **kwargs):
+        """Change requests, optionally with their effort lines (``lines=1``)"""
+        try:
+            fnames = _parse_fields(fields, CHANGE_REQUEST_FIELDS, DEFAULT_CHANGE_REQUEST_FIELDS)
+            line_fnames = _parse_fields(line_fields, EFFORT_LINE_FIELDS, EFFORT_LINE_FIELDS) if lines else None
+            domain = []
+            if state:
+                domain.append(('state', 'in', state.split(',')))
+            if project_id:
+                domain.append(('project_id', '=', int(project_id)))
+            ChangeRequest = request.env['simple.change.request']
+            limit = _parse_limit(limit)
+            page = _keyset_page(ChangeRequest, domain, cursor, limit)
+        except (ApiError, ValueError) as e:
+            return request.make_json_response({'error': str(e)}, status=400)
+
+        line_rows = []
+        if line_fnames is not None and page:
+            # Line changes don't touch their change request: they're part of the ETag too
+            Line = request.env['change.request.effort.line']
+            line_rows = request.env.execute_query(Line._search(
+                [('change_request_id', 'in', [row[0] for row in page])], order='id',
+            ).select(SQL.identifier(Line._table, 'id'), SQL.identifier(Line._table, 'write_date')))
+
+        etag = self._etag('change_requests', fnames, line_fnames, page, line_rows)
+        if self._not_modified(etag):
+            return request.make_response('', headers=self._cache_headers(etag), status=304)
+
+        records = ChangeRequest.browse([row[0] for row in page])
+        records.fetch(fnames)
+        values = [serialize_record(record, fnames) for record in records]
+        if line_fnames is not None:
+            lines_by_request = {}
+            lines = request.env['change.request.effort.line'].browse([row[0] for row in line_rows])
+            lines.fetch(line_fnames + ['change_request_id'])
+            for line in lines:
+                line_values = serialize_record(line, line_fnames)
+                lines_by_request.setdefault(line.change_request_id.id, []).append(line_values)
+            for record_values in values:
+                record_values['effort_lines'] = lines_by_request.get(record_values['id'], [])
+        return self._page_response(values, page, cursor, limit, etag)
+
+    @http.route('/simple_change_request/api/effort_lines', type='http', auth='user', methods=['GET'],
+                readonly=True)
+    def effort_lines(self, cursor=None, limit=None, fields=None, change_request_id=None, **kwargs):
+        """Effort lines of all change requests (or of one)"""
+        try:
+            fnames = _parse_fields(fields, EFFORT_LINE_FIELDS, EFFORT_LINE_FIELDS)
+            domain = [('change_request_id', '=', int(change_request_id))] if change_request_id else []
+            Line = request.env['change.request.effort.line']
+            limit = _parse_limit(limit)
+            page = _keyset_page(Line, domain, cursor, limit)
+        except (ApiError, ValueError) as e:
+            return request.make_json_response({'error': str(e)}, status=400)
+
+        etag = self._etag('effort_lines', fnames, None, page, [])
+        if self._not_modified(etag):
+            return request.make_response('', headers=self._cache_headers(etag), status=304)
+
+        records = Line.browse([row[0] for row in page])
+        records.fetch(fnames)
+        values = [serialize_record(record, fnames) for record in records]
+        return self._page_response(values, page, cursor, limit, etag)
+
+    @http.route('/simple_change_request/api/changes', type='http', auth='user', methods=['GET'],
+                readonly=True)
+    def changes(self, cursor=None, **kwargs):
+        """Change feed since ``cursor``, streamed as NDJSON: one event per line"""
+        try:
+            request.env['simple.change.request']._decode_feed_cursor(cursor)
+        except UserError as e:
+            return request.make_json_response({'error': str(e)}, status=400)
+
+        # The request's cursor is closed before the response is streamed:
+        # the feed reads through its own, in a single snapshot
+        registry, uid, context = request.env.registry, request.env.uid, dict(request.env.context)
+
+        def stream():
+            with registry.cursor(readonly=True) as cr:
+                env = api.Environment(cr, uid, context)
+                for event in env['simple.change.request']._iter_change_feed(cursor):
+                    yield json.dumps(event) + '\n'
+
+        return http.Response(stream(), content_type='application/x-ndjson', headers=[
+            ('Cache-Control', 'no-store'),
+        ])
+
+    def _etag(self, endpoint, fnames, line_fnames, page, line_rows):
+        payload = json.dumps([
+            endpoint,
+            request.env.uid,
+            fnames,
+            line_fnames,
+            [(record_id, write_date.isoformat()) for record_id, write_date in page],
+            [(line_id, write_date.isoformat()) for line_id, write_date in line_rows],
+        ])
+        return f'"{hashlib.sha1(payload.encode()).hexdigest()}"'
+
+    def _not_modified(self, etag):
+        if_none_match = request.httprequest.headers.get('If-None-Match', '')
+        return etag in (tag.strip().removeprefix('W/') for tag in if_none_match.split(','))
+
+    def _cache_headers(self, etag):
+        # Clients may keep the page but must revalidate it every time
+        return [('ETag', etag), ('Cache-Control', 'private, no-cache')]
+
+    def _page_response(self, values, page, cursor, limit, etag):
+        return request.make_json_response({
+            'records': values,
+            # Polling from the last cursor returns the records changed since
+            'next_cursor': _encode_cursor(page[-1][1], page[-1][0]) if page else cursor,
+            'has_more': len(page) == limit,
+        }, headers=self._cache_headers(etag))
@@ -0,0 +1,30 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Fold the former free-text project names into change.request.project"""
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+
+    # project_name is no longer stored, but its column is still there
+    cr.execute("""
+        SELECT 1 FROM information_schema.columns
+         WHERE table_name = 'simple_change_request' AND column_name = 'project_name'
+    """)
+    if not cr.fetchone():
+        return
+
+    cr.execute("""
+        SELECT DISTINCT project_name FROM simple_change_request
+         WHERE project_id IS NULL AND project_name IS NOT NULL
+    """)
+    names = [row[0] for row in cr.fetchall()]
+    projects = env['change.request.project']._get_or_create_by_name(names)
+    for name, project in projects.items():
+        cr.execute(
+            "UPDATE simple_change_request SET project_id = %s WHERE project_id IS NULL AND project_name = %s",
+            (project.id, name),
+        )
+    env['simple.change.request'].invalidate_model(['project_id'])
+    env['change.request.project'].with_context(active_test=False).search([])._refresh_rollups()
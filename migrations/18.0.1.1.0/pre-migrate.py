@@ -0,0 +1,38 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Make the change numbers unique before their constraint is installed.
+
+    Change numbers used to default to CR-0001 and were never checked: the
+    oldest change request keeps its number, the others get a suffix.
+    """
+    if not version:
+        return
+
+    cr.execute("""
+        SELECT change_number, ARRAY_AGG(id ORDER BY id)
+          FROM simple_change_request
+         WHERE change_number IS NOT NULL
+      GROUP BY change_number
+        HAVING COUNT(*) > 1
+    """)
+    duplicates = cr.fetchall()
+    if not duplicates:
+        return
+
+    cr.execute("SELECT change_number FROM simple_change_request WHERE change_number IS NOT NULL")
+    used = {row[0] for row in cr.fetchall()}
+    renumbered = []
+    for number, ids in duplicates:
+        suffix = 1
+        for record_id in ids[1:]:
+            suffix += 1
+            while f"{number}-{suffix}" in used:
+                suffix += 1
+            used.add(f"{number}-{suffix}")
+            renumbered.append((f"{number}-{suffix}", record_id))
+    cr.executemany("UPDATE simple_change_request SET change_number = %s WHERE id = %s", renumbered)
+    _logger.info("Renumbered %s change requests sharing their change number", len(renumbered))
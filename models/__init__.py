@@ -1,3 +1,16 @@
 from . import simple_change_request
 from . import change_request_export_wizard
 from . import change_request_effort_line
+from . import change_request_template
+from . import change_request_export_job
+from . import ir_attachment
+from . import ir_sequence
+from . import change_request_transition_log
+from . import change_request_project
+from . import change_request_effort_import_wizard
+from . import change_request_export_stat
+from . import change_request_tombstone
+from . import change_request_archive
+from . import change_request_effort_report
+from . import change_request_register_export_wizard
+from . import change_request_revision
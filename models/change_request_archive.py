@@ -0,0 +1,319 @@
+import base64
+import json
+import zipfile
+from datetime import datetime, timedelta
+from io import BytesIO
+
+from odoo import models, fields, api, Command
+from odoo.exceptions import UserError
+from odoo.tools import split_every
+
+from ..tools.api_values import serialize_record
+from .simple_change_request import STATES
+
+# States of the change requests that may be archived
+CLOSED_STATES = ['completed', 'rejected']
+
+# Closed change requests untouched for this many days are archived by default
+ARCHIVE_AFTER_DAYS = 365
+
+# Number of change requests moved to the archive per transaction, and number
+# of those transactions per cron run
+ARCHIVE_BATCH_SIZE = 100
+ARCHIVE_CRON_BATCHES = 50
+
+# Members of an archive package
+PAYLOAD_MEMBER = 'change_request.json'
+EXPORTS_FOLDER = 'exports/'
+
+# Fields left out of the archived values: the parent of the lines is set
+# again on restore
+ARCHIVE_SKIPPED_FIELDS = {'id', 'change_request_id'}
+
+class ChangeRequestArchive(models.Model):
+    _name = 'change.request.archive'
+    _description = 'Archived Change Request'
+    _order = 'closed_date desc, id desc'
+    _log_access = False
+    
+    # Summary, searchable without opening the package
+    name = fields.Char(
+        string="Request Title",
+        required=True
+    )
+    
+    change_number = fields.Char(
+        string="Change Number",
+        index=True
+    )
+    
+    state = fields.Selection(
+        STATES,
+        string="Status",
+        required=True
+    )
+    
+    project_id = fields.Many2one(
+        'change.request.project',
+        string="Project",
+        index=True,
+        ondelete='restrict'
+    )
+    
+    requester_id = fields.Many2one(
+        'res.users',
+        string="Requester"
+    )
+    
+    change_request_date = fields.Date(
+        string="Change Request Date"
+    )
+    
+    total_effort_days = fields.Float(
+        string="Total Effort (Days)"
+    )
+    
+    effort_line_count = fields.Integer(
+        string="Effort Lines"
+    )
+    
+    export_count = fields.Integer(
+        string="Exports"
+    )
+    
+    search_document = fields.Text(
+        string="Content",
+        prefetch=False,
+        help="Plain text of the narrative fields, searched on demand"
+    )
+    
+    closed_date = fields.Datetime(
+        string="Last Modified",
+        index=True,
+        help="Last modification of the change request before it was archived"
+    )
+    
+    archived_date = fields.Datetime(
+        string="Archived On",
+        default=fields.Datetime.now,
+        required=True
+    )
+    
+    # Everything else, compressed in the filestore
+    package = fields.Binary(
+        string="Package",
+        attachment=True,
+        help="ZIP of the change request with its effort lines, status history, revisions and exported documents"
+    )
+    
+    package_size = fields.Integer(
+        string="Package Size"
+    )
+    
+    @api.model
+    def _archived_fields(self, model):
+        """Fields of ``model`` stored in the archive and written back on restore"""
+        return [
+            fname for fname, field in self.env[model]._fields.items()
+            if field.store and not field.compute and not field.related
+            and field.type not in ('one2many', 'many2many')
+            and fname not in models.MAGIC_COLUMNS and fname not in ARCHIVE_SKIPPED_FIELDS
+        ]
+    
+    @api.model
+    def _archive_change_requests(self, change_requests):
+        """Move change requests to the archive, with their effort lines,
+        status history and exported documents; return the archives"""
+        request_fnames = self._archived_fields('simple.change.request')
+        line_fnames = self._archived_fields('change.request.effort.line')
+        log_fnames = self._archived_fields('change.request.transition.log')
+        revision_fnames = [fname for fname in self._archived_fields('change.request.revision') if fname != 'payload']
+        change_requests.fetch(request_fnames + ['search_document', 'total_effort_days', 'create_date', 'write_date'])
+        
+        lines_by_request, logs_by_request, revisions_by_request, exports_by_request = {}, {}, {}, {}
+        for line in self.env['change.request.effort.line'].search_fetch(
+            [('change_request_id', 'in', change_requests.ids)], line_fnames + ['change_request_id'],
+        ):
+            lines_by_request.setdefault(line.change_request_id.id, []).append(serialize_record(line, line_fnames))
+        for log in self.env['change.request.transition.log'].search_fetch(
+            [('change_request_id', 'in', change_requests.ids)], log_fnames + ['change_request_id'], order='date, id',
+        ):
+            logs_by_request.setdefault(log.change_request_id.id, []).append(serialize_record(log, log_fnames))
+        for revision in self.env['change.request.revision'].with_context(bin_size=False).search_fetch(
+            [('change_request_id', 'in', change_requests.ids)], revision_fnames + ['change_request_id', 'payload'],
+            order='revision_number',
+        ):
+            # Payloads are already compressed: kept as they are (base64)
+            values = dict(serialize_record(revision, revision_fnames), payload=revision.payload.decode())
+            revisions_by_request.setdefault(revision.change_request_id.id, []).append(values)
+        attachments = self.env['ir.attachment'].search([
+            ('res_model', '=', 'simple.change.request'),
+            ('res_id', 'in', change_requests.ids),
+            ('type', '=', 'binary'),
+        ], order='id')
+        for attachment in attachments:
+            exports_by_request.setdefault(attachment.res_id, self.env['ir.attachment'])
+            exports_by_request[attachment.res_id] |= attachment
+        
+        vals_list = []
+        for change_request in change_requests:
+            values = serialize_record(change_request, request_fnames)
+            values['create_date'] = change_request.create_date.isoformat()
+            lines = lines_by_request.get(change_request.id, [])
+            exports = exports_by_request.get(change_request.id, self.env['ir.attachment'])
+            package = self._make_package({
+                'change_request': values,
+                'effort_lines': lines,
+                'transition_log': logs_by_request.get(change_request.id, []),
+                'revisions': revisions_by_request.get(change_request.id, []),
+                'exports': [
+                    {'name': attachment.name, 'mimetype': attachment.mimetype,
+                     'export_render_key': attachment.export_render_key or None}
+                    for attachment in exports
+                ],
+            }, exports)
+            vals_list.append({
+                'name': change_request.name,
+                'change_number': change_request.change_number,
+                'state': change_request.state,
+                'project_id': change_request.project_id.id,
+                'requester_id': change_request.requester_id.id,
+                'change_request_date': change_request.change_request_date,
+                'total_effort_days': change_request.total_effort_days,
+                'effort_line_count': len(lines),
+                'export_count': len(exports),
+                'search_document': change_request.search_document,
+                'closed_date': change_request.write_date,
+                'package': base64.b64encode(package),
+                'package_size': len(package),
+            })
+        
+        archives = self.create(vals_list)
+        # Lines and status history go with their change request (cascade)
+        attachments.unlink()
+        change_requests.unlink()
+        return archives
+    
+    @api.model
+    def _make_package(self, payload, exports):
+        package = BytesIO()
+        with zipfile.ZipFile(package, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=9) as archive:
+            archive.writestr(PAYLOAD_MEMBER, json.dumps(payload))
+            for index, attachment in enumerate(exports):
+                archive.writestr(f'{EXPORTS_FOLDER}{index}', attachment.raw or b'')
+        return package.getvalue()
+    
+    def _read_package(self):
+        """Payload and exported documents of this archive"""
+        self.ensure_one()
+        data = base64.b64decode(self.with_context(bin_size=False).package or b'')
+        with zipfile.ZipFile(BytesIO(data)) as archive:
+            payload = json.loads(archive.read(PAYLOAD_MEMBER))
+            documents = [archive.read(f'{EXPORTS_FOLDER}{index}') for index in range(len(payload['exports']))]
+        return payload, documents
+    
+    @api.model
+    def _restore_values(self, model, values, user_ids):
+        """Archived ``values`` of a ``model`` record, ready to be written back:
+        dates parsed from their ISO format, and users deleted since the
+        archival (not in ``user_ids``) replaced by the current user"""
+        Model = self.env[model]
+        values = {fname: value for fname, value in values.items() if fname in Model._fields and fname != 'id'}
+        for fname, value in values.items():
+            field = Model._fields[fname]
+            if value and field.type == 'datetime':
+                values[fname] = datetime.fromisoformat(value)
+            elif value and field.type == 'many2one' and field.comodel_name == 'res.users' and value not in user_ids:
+                values[fname] = self.env.uid
+        return values
+    
+    def _restore(self):
+        """Move these archives back into change requests; return them"""
+        ChangeRequest = self.env['simple.change.request'].with_context(restoring_archive=True)
+        restored = ChangeRequest.browse()
+        for archive in self:
+            payload, documents = archive._read_package()
+            records = [payload['change_request'], *payload['transition_log'], *payload.get('revisions', [])]
+            user_ids = set(self.env['res.users'].browse({
+                record[fname] for record in records for fname in ('requester_id', 'user_id') if record.get(fname)
+            }).exists().ids)
+            
+            values = self._restore_values('simple.change.request', payload['change_request'], user_ids)
+            values.pop('create_date', None)
+            values['effort_breakdown_ids'] = [
+                Command.create(self._restore_values('change.request.effort.line', line, user_ids))
+                for line in payload['effort_lines']
+            ]
+            change_request = ChangeRequest.create(values)
+            # The status history and the revisions are only ever written by
+            # the system (packages archived before revisions were kept have none)
+            self.env['change.request.transition.log'].sudo().create([
+                dict(self._restore_values('change.request.transition.log', log, user_ids),
+                     change_request_id=change_request.id)
+                for log in payload['transition_log']
+            ])
+            self.env['change.request.revision'].sudo().create([
+                dict(self._restore_values('change.request.revision', revision, user_ids),
+                     change_request_id=change_request.id)
+                for revision in payload.get('revisions', [])
+            ])
+            self.env['ir.attachment'].create([
+                dict(export, raw=document, res_model='simple.change.request', res_id=change_request.id)
+                for export, document in zip(payload['exports'], documents)
+            ])
+            restored |= change_request
+        self.unlink()
+        return restored
+    
+    def action_restore(self):
+        """Restore the selected archives and open the restored change requests"""
+        restored = self._restore()
+        action = {
+            'type': 'ir.actions.act_window',
+            'name': 'Restored Change Requests',
+            'res_model': 'simple.change.request',
+            'view_mode': 'list,form',
+            'domain': [('id', 'in', restored.ids)],
+        }
+        if len(restored) == 1:
+            action.update(view_mode='form', res_id=restored.id)
+        return action
+    
+    @api.model
+    def _get_archive_cutoff(self):
+        days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'simple_change_request.archive_after_days', ARCHIVE_AFTER_DAYS
+        ))
+        return fields.Datetime.now() - timedelta(days=days)
+    
+    @api.model
+    def _cron_archive_closed_requests(self, limit=ARCHIVE_CRON_BATCHES, auto_commit=True):
+        """Archive the change requests closed for longer than the configured
+        age, a batch per transaction"""
+        cutoff = self._get_archive_cutoff()
+        for _dummy in range(limit):
+            change_requests = self.env['simple.change.request'].search([
+                ('state', 'in', CLOSED_STATES),
+                ('write_date', '<', cutoff),
+            ], order='write_date, id', limit=ARCHIVE_BATCH_SIZE)
+            if not change_requests:
+                break
+            self._archive_change_requests(change_requests)
+            if auto_commit:
+                self.env.cr.commit()
+            self.env.invalidate_all()
+    
+    @api.model
+    def action_archive_change_requests(self, change_request_ids):
+        """Archive the selected closed change requests right away"""
+        change_requests = self.env['simple.change.request'].browse(change_request_ids)
+        if any(state not in CLOSED_STATES for state in change_requests.mapped('state')):
+            raise UserError("Only completed or rejected change requests can be archived.")
+        for ids in split_every(ARCHIVE_BATCH_SIZE, change_requests.ids):
+            self._archive_change_requests(change_requests.browse(ids))
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Change Request Archive',
+            'res_model': 'change.request.archive',
+            'view_mode': 'list,form',
+        }
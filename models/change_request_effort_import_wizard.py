@@ -0,0 +1,116 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+import base64
+import csv
+import io
+
+# Accepted column headers (field names or labels, compared case-insensitively)
+IMPORT_COLUMNS = {
+    'change_number': 'change_number',
+    'change number': 'change_number',
+    'task_number': 'task_number',
+    'task no.': 'task_number',
+    'task no': 'task_number',
+    'no.': 'task_number',
+    'expected_task': 'expected_task',
+    'expected task': 'expected_task',
+    'effort_days': 'effort_days',
+    'effort (days)': 'effort_days',
+    'effort': 'effort_days',
+    'remarks': 'remarks',
+    'task_category': 'task_category',
+    'task category': 'task_category',
+}
+
+class ChangeRequestEffortImportWizard(models.TransientModel):
+    _name = 'change.request.effort.import.wizard'
+    _description = 'Change Request Effort Breakdown Import'
+    
+    change_request_id = fields.Many2one(
+        'simple.change.request',
+        string="Change Request",
+        help="Change request receiving the rows without a Change Number column"
+    )
+    
+    import_file = fields.Binary(
+        string="File",
+        required=True,
+        help="CSV or XLSX file with one effort line per row"
+    )
+    
+    import_filename = fields.Char(
+        string="Filename"
+    )
+    
+    @api.model
+    def default_get(self, fields_list):
+        """Target the change request the wizard was opened from"""
+        res = super().default_get(fields_list)
+        if (
+            'change_request_id' in fields_list and not res.get('change_request_id')
+            and self.env.context.get('active_model') == 'simple.change.request'
+        ):
+            res['change_request_id'] = self.env.context.get('active_id')
+        return res
+    
+    def action_import(self):
+        """Import the effort lines of the uploaded file"""
+        self.ensure_one()
+        rows = self._read_rows(base64.b64decode(self.import_file), self.import_filename or '')
+        lines = self.env['change.request.effort.line']._bulk_import(rows, self.change_request_id)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'success',
+                'message': f"{len(lines)} effort lines imported.",
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
+    
+    @api.model
+    def _read_rows(self, data, filename):
+        """Parse a CSV or XLSX file into dicts keyed by effort line field,
+        with the number of their row in the file under ``row_number``"""
+        if filename.lower().endswith('.xlsx'):
+            header, records = self._read_xlsx(data)
+        else:
+            header, records = self._read_csv(data)
+        
+        columns = [IMPORT_COLUMNS.get(str(title or '').strip().lower()) for title in header]
+        if 'expected_task' not in columns:
+            raise UserError("The file must have an 'Expected Task' column.")
+        return [
+            dict({column: value for column, value in zip(columns, record) if column}, row_number=row_number)
+            for row_number, record in enumerate(records, start=2)
+            if any(value not in (None, '') for value in record)
+        ]
+    
+    @api.model
+    def _read_csv(self, data):
+        try:
+            text = data.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise UserError("CSV files must be UTF-8 encoded.")
+        try:
+            dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t')
+        except csv.Error:
+            # Empty or single-column file: nothing to split on
+            dialect = csv.excel
+        reader = csv.reader(io.StringIO(text), dialect)
+        header = next(reader, [])
+        return header, list(reader)
+    
+    @api.model
+    def _read_xlsx(self, data):
+        try:
+            import openpyxl
+        except ImportError:
+            raise UserError("Please install openpyxl library: pip install openpyxl")
+        workbook = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, ())
+            return header, [list(row) for row in rows]
+        finally:
+            workbook.close()
@@ -1,5 +1,16 @@
 from odoo import models, fields, api
-from odoo.exceptions import ValidationError
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import SQL, split_every
+from odoo.tools.sql import create_index, index_exists
+
+# Number of effort lines inserted per create() call during a bulk import
+IMPORT_BATCH_SIZE = 1000
+
+# Number of row errors reported when an import is rejected
+IMPORT_MAX_ERRORS = 20
+
+# Fields whose change records a revision of the change request
+REVISION_TRIGGERS = {'task_number', 'expected_task', 'effort_days', 'remarks', 'task_category', 'change_request_id'}
 
 class ChangeRequestEffortLine(models.Model):
     _name = 'change.request.effort.line'
@@ -11,6 +22,7 @@ class ChangeRequestEffortLine(models.Model):
         'simple.change.request',
         string="Change Request",
         required=True,
+        index=True,
         ondelete='cascade'
     )
     
@@ -43,6 +55,183 @@ class ChangeRequestEffortLine(models.Model):
         ('other', 'Other')
     ], string="Task Category", default='development')
     
+    def init(self):
+        """Keyset index of the read API"""
+        index_name = f'{self._table}_write_date_id_index'
+        if not index_exists(self.env.cr, index_name):
+            create_index(self.env.cr, index_name, self._table, ['write_date', 'id'])
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Keep the effort rollup of the affected projects up to date, and
+        the revision history of the change requests"""
+        change_requests, before = self._snapshot_revised_change_requests(self.env['simple.change.request'].browse({
+            vals.get('change_request_id') or self.env.context.get('default_change_request_id') for vals in vals_list
+        } - {False, None}))
+        lines = super().create(vals_list)
+        if not self.env.context.get('defer_effort_rollups'):
+            lines.change_request_id.project_id._refresh_rollups()
+        self.env['change.request.revision']._record_revisions(change_requests, before)
+        return lines
+    
+    def write(self, vals):
+        """Keep the effort rollup of the affected projects up to date, and
+        the revision history of the change requests"""
+        revised = self.change_request_id
+        if vals.get('change_request_id'):
+            revised |= revised.browse(vals['change_request_id'])
+        change_requests, before = self._snapshot_revised_change_requests(
+            revised if REVISION_TRIGGERS.intersection(vals) else revised.browse()
+        )
+        if 'effort_days' not in vals and 'change_request_id' not in vals:
+            res = super().write(vals)
+        else:
+            projects = self.change_request_id.project_id
+            res = super().write(vals)
+            (projects | self.change_request_id.project_id)._refresh_rollups()
+        self.env['change.request.revision']._record_revisions(change_requests, before)
+        return res
+    
+    def unlink(self):
+        """Keep the effort rollup of the affected projects up to date, leave
+        tombstones for the change feed, and record a revision of the change
+        requests"""
+        self.env['change.request.tombstone']._record_deletions(self._name, self.ids)
+        change_requests, before = self._snapshot_revised_change_requests(self.change_request_id)
+        projects = self.change_request_id.project_id
+        res = super().unlink()
+        projects._refresh_rollups()
+        self.env['change.request.revision']._record_revisions(change_requests, before)
+        return res
+    
+    def _snapshot_revised_change_requests(self, change_requests):
+        """Change requests whose effort breakdown is about to change, with
+        their current version; none when the caller records the revision"""
+        if self.env.context.get('skip_revisions') or not change_requests:
+            return change_requests.browse(), {}
+        return change_requests, self.env['change.request.revision']._take_snapshots(change_requests)
+    
+    # Bulk Import
+    @api.model
+    def _bulk_import(self, rows, change_request=None):
+        """Create effort lines from imported rows, as fast as possible.
+        
+        ``rows`` are dicts keyed by field name (values as read from the file);
+        rows without a ``change_number`` go to ``change_request``. All rows are
+        validated in one pass before anything is written, lines are inserted
+        in batches, and each affected change request gets its total
+        recomputed once, with a single SQL aggregate.
+        """
+        vals_list = self._prepare_import_values(rows, change_request)
+        if not vals_list:
+            return self.browse()
+        
+        change_requests = self.env['simple.change.request'].browse(
+            {vals['change_request_id'] for vals in vals_list}
+        )
+        total_field = change_requests._fields['total_effort_days']
+        # A single revision for the whole import
+        revised, before = self._snapshot_revised_change_requests(change_requests)
+        lines = self.browse()
+        # Don't recompute the totals line by line: they are refreshed below
+        with self.env.protecting([total_field], change_requests):
+            for batch in split_every(IMPORT_BATCH_SIZE, vals_list):
+                lines |= self.with_context(defer_effort_rollups=True, skip_revisions=True).create(list(batch))
+        
+        self.flush_model()
+        self.env.cr.execute(SQL("""
+            UPDATE simple_change_request cr
+               SET total_effort_days = totals.total,
+                   write_date = (now() at time zone 'UTC'),
+                   write_uid = %s
+              FROM (
+                    SELECT change_request_id, SUM(effort_days) AS total
+                      FROM change_request_effort_line
+                     WHERE change_request_id IN %s
+                  GROUP BY change_request_id
+                   ) totals
+             WHERE cr.id = totals.change_request_id
+        """, self.env.uid, tuple(change_requests.ids)))
+        # Stamped like an ORM write: the read API and the change feed see the new totals
+        change_requests.invalidate_recordset(['total_effort_days', 'write_date', 'write_uid'])
+        change_requests.project_id._refresh_rollups()
+        self.env['change.request.revision']._record_revisions(revised, before)
+        return lines
+    
+    @api.model
+    def _prepare_import_values(self, rows, change_request=None):
+        """Validate all imported rows at once and convert them to create values.
+        
+        Every problem is collected and reported together, so that a file can be
+        fixed in one go; nothing is created if any row is invalid.
+        """
+        categories = dict(self._fields['task_category'].selection)
+        categories_by_label = {label.lower(): key for key, label in categories.items()}
+        
+        # Resolve all referenced change numbers with a single query
+        numbers = {str(row['change_number']).strip() for row in rows if row.get('change_number')}
+        change_requests = self.env['simple.change.request'].search_fetch(
+            [('change_number', 'in', list(numbers))], ['change_number'],
+        ) if numbers else self.env['simple.change.request']
+        by_number = {cr.change_number: cr.id for cr in change_requests}
+        
+        errors = []
+        vals_list = []
+        for index, row in enumerate(rows, start=2):
+            # Rows read from a file know their place in it (blank rows are skipped)
+            index = row.get('row_number', index)
+            number = str(row.get('change_number') or '').strip()
+            if number:
+                change_request_id = by_number.get(number)
+                if not change_request_id:
+                    errors.append(f"Row {index}: unknown change number {number}.")
+            elif change_request:
+                change_request_id = change_request.id
+            else:
+                change_request_id = False
+                errors.append(f"Row {index}: missing change number.")
+            
+            expected_task = str(row.get('expected_task') or '').strip()
+            if not expected_task:
+                errors.append(f"Row {index}: the expected task is required.")
+            
+            effort_days = row.get('effort_days')
+            try:
+                effort_days = float(effort_days) if effort_days not in (None, '') else 0.0
+            except (TypeError, ValueError):
+                errors.append(f"Row {index}: invalid effort {effort_days!r}.")
+                effort_days = 0.0
+            if effort_days < 0:
+                errors.append(f"Row {index}: effort days cannot be negative.")
+            
+            category = str(row.get('task_category') or '').strip()
+            if not category:
+                category = self._fields['task_category'].default(self)
+            elif category not in categories:
+                category = categories_by_label.get(category.lower(), category)
+                if category not in categories:
+                    errors.append(f"Row {index}: unknown task category {row['task_category']!r}.")
+            
+            task_number = row.get('task_number')
+            if isinstance(task_number, float) and task_number.is_integer():
+                task_number = int(task_number)
+            
+            vals_list.append({
+                'change_request_id': change_request_id,
+                'task_number': str(task_number).strip() if task_number not in (None, '') else False,
+                'expected_task': expected_task,
+                'effort_days': effort_days,
+                'remarks': str(row.get('remarks') or '').strip() or False,
+                'task_category': category,
+            })
+        
+        if errors:
+            shown = errors[:IMPORT_MAX_ERRORS]
+            if len(errors) > IMPORT_MAX_ERRORS:
+                shown.append(f"... and {len(errors) - IMPORT_MAX_ERRORS} more errors.")
+            raise UserError("The file could not be imported:\n" + "\n".join(shown))
+        return vals_list
+    
     @api.constrains('effort_days')
     def _check_effort_days(self):
         for record in self:
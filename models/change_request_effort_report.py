@@ -0,0 +1,138 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+from .simple_change_request import STATES
+
+# Advisory lock serializing the refreshes of the effort analysis
+EFFORT_REPORT_LOCK = 'simple_change_request.effort_report_refresh'
+
+# Single-row table holding the time of the last refresh (a config parameter
+# would clear the registry caches of every worker on each refresh)
+EFFORT_REPORT_REFRESH_TABLE = 'change_request_effort_report_refresh'
+
+class ChangeRequestEffortReport(models.Model):
+    _name = 'change.request.effort.report'
+    _description = 'Change Request Effort Analysis'
+    _auto = False
+    _order = 'date desc, project_id, task_category'
+    _rec_name = 'date'
+    
+    date = fields.Date(
+        string="Month",
+        readonly=True
+    )
+    
+    project_id = fields.Many2one(
+        'change.request.project',
+        string="Project",
+        readonly=True
+    )
+    
+    department = fields.Char(
+        string="Department",
+        readonly=True
+    )
+    
+    task_category = fields.Selection(
+        selection='_get_task_categories',
+        string="Task Category",
+        readonly=True
+    )
+    
+    state = fields.Selection(
+        STATES,
+        string="Status",
+        readonly=True
+    )
+    
+    effort_days = fields.Float(
+        string="Effort (Days)",
+        readonly=True,
+        aggregator='sum'
+    )
+    
+    line_count = fields.Integer(
+        string="Effort Lines",
+        readonly=True,
+        aggregator='sum'
+    )
+    
+    def init(self):
+        """Effort per month, project, department, category and status,
+        precomputed in a materialized view"""
+        self.env.cr.execute(SQL("DROP MATERIALIZED VIEW IF EXISTS %s", SQL.identifier(self._table)))
+        self.env.cr.execute(SQL("""
+            CREATE MATERIALIZED VIEW %s AS (
+                SELECT MIN(line.id) AS id,
+                       date_trunc('month', request.change_request_date)::date AS date,
+                       request.project_id,
+                       request.department,
+                       line.task_category,
+                       request.state,
+                       SUM(line.effort_days) AS effort_days,
+                       COUNT(*) AS line_count
+                  FROM change_request_effort_line line
+                  JOIN simple_change_request request ON request.id = line.change_request_id
+              GROUP BY 2, request.project_id, request.department, line.task_category, request.state
+            )
+        """, SQL.identifier(self._table)))
+        # Every line belongs to a single group: the smallest line id
+        # identifies its row, as CONCURRENTLY requires
+        self.env.cr.execute(SQL(
+            "CREATE UNIQUE INDEX %s ON %s (id)",
+            SQL.identifier(f'{self._table}_id_index'), SQL.identifier(self._table),
+        ))
+        self.env.cr.execute(SQL("""
+            CREATE TABLE IF NOT EXISTS %s (
+                id boolean PRIMARY KEY DEFAULT TRUE CHECK (id),
+                refreshed_at timestamp NOT NULL
+            )
+        """, SQL.identifier(EFFORT_REPORT_REFRESH_TABLE)))
+        self._stamp_refresh()
+    
+    @api.model
+    def _get_task_categories(self):
+        return self.env['change.request.effort.line']._fields['task_category'].selection
+    
+    @api.model
+    def _refresh(self):
+        """Recompute the analysis without blocking its readers; return
+        False when another refresh is already running"""
+        self.env.cr.execute(SQL("SELECT pg_try_advisory_xact_lock(hashtext(%s))", EFFORT_REPORT_LOCK))
+        if not self.env.cr.fetchone()[0]:
+            return False
+        self.env.flush_all()
+        self.env.cr.execute(SQL("REFRESH MATERIALIZED VIEW CONCURRENTLY %s", SQL.identifier(self._table)))
+        self._stamp_refresh()
+        self.invalidate_model()
+        return True
+    
+    @api.model
+    def _stamp_refresh(self):
+        self.env.cr.execute(SQL("""
+            INSERT INTO %s (refreshed_at) VALUES (now() at time zone 'UTC')
+            ON CONFLICT (id) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at
+        """, SQL.identifier(EFFORT_REPORT_REFRESH_TABLE)))
+    
+    @api.model
+    def _get_refreshed_at(self):
+        """Time (UTC) of the last refresh of the analysis"""
+        rows = self.env.execute_query(SQL(
+            "SELECT refreshed_at FROM %s", SQL.identifier(EFFORT_REPORT_REFRESH_TABLE),
+        ))
+        return rows[0][0] if rows else None
+    
+    @api.model
+    def _cron_refresh(self):
+        """Scheduled refresh of the analysis"""
+        self._refresh()
+    
+    @api.model
+    def action_refresh(self):
+        """Refresh the analysis on demand and open it"""
+        self._refresh()
+        action = self.env['ir.actions.act_window']._for_xml_id(f'{self._module}.action_change_request_effort_report')
+        refreshed_at = self._get_refreshed_at()
+        if refreshed_at:
+            action['name'] = f"{action['name']} (refreshed {fields.Datetime.to_string(refreshed_at)} UTC)"
+        return action
@@ -0,0 +1,310 @@
+from odoo import models, fields, api, Command
+from odoo.exceptions import UserError
+from datetime import timedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# A job running for longer than this many minutes by default is taken for
+# dead (its worker was killed or restarted) and retried or failed
+EXPORT_JOB_TIMEOUT_MINUTES = 60
+
+# Seconds before the first retry of a failed job, doubled on every attempt
+EXPORT_RETRY_DELAY = 60
+
+class ChangeRequestExportJob(models.Model):
+    _name = 'change.request.export.job'
+    _description = 'Change Request Background Export Job'
+    _order = 'id desc'
+    
+    name = fields.Char(
+        string="Name",
+        compute='_compute_name',
+        store=True
+    )
+    
+    user_id = fields.Many2one(
+        'res.users',
+        string="Requested By",
+        default=lambda self: self.env.user,
+        required=True,
+        readonly=True
+    )
+    
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed')
+    ], string="Status", default='queued', required=True, readonly=True, index=True)
+    
+    # Export parameters, as entered in the export wizard
+    export_mode = fields.Selection([
+        ('single', 'Single Change Request'),
+        ('batch', 'Multiple Change Requests')
+    ], string="Export Mode", default='single', required=True, readonly=True)
+    
+    change_request_id = fields.Many2one(
+        'simple.change.request',
+        string="Change Request",
+        ondelete='cascade',
+        readonly=True
+    )
+    
+    change_request_ids = fields.Many2many(
+        'simple.change.request',
+        string="Change Requests",
+        readonly=True
+    )
+    
+    export_domain = fields.Char(
+        string="Domain",
+        readonly=True
+    )
+    
+    template_id = fields.Many2one(
+        'change.request.template',
+        string="Word Template",
+        readonly=True
+    )
+    
+    output_filename = fields.Char(
+        string="Output Filename",
+        readonly=True
+    )
+    
+    archive_filename = fields.Char(
+        string="Archive Filename",
+        readonly=True
+    )
+    
+    include_effort_breakdown = fields.Boolean(
+        string="Include Effort Breakdown",
+        default=True,
+        readonly=True
+    )
+    
+    # Execution tracking
+    phase = fields.Char(
+        string="Phase",
+        readonly=True
+    )
+    
+    progress = fields.Float(
+        string="Progress",
+        readonly=True,
+        help="Completion percentage of the export"
+    )
+    
+    attempt_count = fields.Integer(
+        string="Attempts",
+        readonly=True
+    )
+    
+    max_attempts = fields.Integer(
+        string="Max Attempts",
+        default=3
+    )
+    
+    error_message = fields.Text(
+        string="Error",
+        readonly=True
+    )
+    
+    next_attempt = fields.Datetime(
+        string="Next Attempt",
+        readonly=True,
+        help="A failed job is retried after this date"
+    )
+    
+    date_started = fields.Datetime(
+        string="Started On",
+        readonly=True
+    )
+    
+    date_finished = fields.Datetime(
+        string="Finished On",
+        readonly=True
+    )
+    
+    attachment_id = fields.Many2one(
+        'ir.attachment',
+        string="Exported File",
+        readonly=True
+    )
+    
+    @api.depends('export_mode', 'change_request_id', 'change_request_ids')
+    def _compute_name(self):
+        for record in self:
+            if record.export_mode == 'batch':
+                record.name = f"Word export of {len(record.change_request_ids) or 'selected'} change requests"
+            else:
+                record.name = f"Word export of {record.change_request_id.display_name or ''}"
+    
+    def action_download(self):
+        """Download the exported file"""
+        self.ensure_one()
+        if not self.attachment_id:
+            raise UserError("This export has not produced a file yet.")
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/web/content/{self.attachment_id.id}?download=true',
+            'target': 'self',
+        }
+    
+    def action_retry(self):
+        """Queue failed jobs again"""
+        self.filtered(lambda job: job.state == 'failed').write({
+            'state': 'queued',
+            'attempt_count': 0,
+            'next_attempt': False,
+            'error_message': False,
+        })
+        self._trigger_processing()
+        return True
+    
+    def _trigger_processing(self):
+        """Wake up the processing cron instead of waiting for its next run"""
+        self.env.ref(f'{self._module}.ir_cron_process_export_jobs').sudo()._trigger()
+    
+    # Processing
+    @api.model
+    def _cron_process_jobs(self, limit=10, auto_commit=True):
+        """Run queued jobs one at a time, each in its own transaction"""
+        self._recover_stale_jobs(auto_commit=auto_commit)
+        for _dummy in range(limit):
+            job = self._acquire_next_job()
+            if not job:
+                break
+            job._run(auto_commit=auto_commit)
+    
+    @api.model
+    def _acquire_next_job(self):
+        """Lock the oldest queued job due to run, skipping those taken by other workers"""
+        self.env.cr.execute("""
+            SELECT id FROM change_request_export_job
+             WHERE state = 'queued'
+               AND (next_attempt IS NULL OR next_attempt <= %s)
+             ORDER BY id
+             LIMIT 1
+               FOR UPDATE SKIP LOCKED
+        """, [fields.Datetime.now()])
+        row = self.env.cr.fetchone()
+        return self.browse(row[0]) if row else self.browse()
+    
+    @api.model
+    def _recover_stale_jobs(self, auto_commit=True):
+        """Retry (or fail) the jobs left running by a worker killed by a
+        memory or time limit or a restart"""
+        timeout = int(self.env['ir.config_parameter'].sudo().get_param(
+            'simple_change_request.export_job_timeout', EXPORT_JOB_TIMEOUT_MINUTES
+        ))
+        self.env.cr.execute("""
+            SELECT id FROM change_request_export_job
+             WHERE state = 'running'
+               AND date_started < %s
+               FOR UPDATE SKIP LOCKED
+        """, [fields.Datetime.now() - timedelta(minutes=timeout)])
+        for job in self.browse([row[0] for row in self.env.cr.fetchall()]):
+            _logger.warning("Word export job %s was interrupted (attempt %s)", job.id, job.attempt_count)
+            job._handle_failure(f"The export was interrupted: it did not finish within {timeout} minutes.")
+        if auto_commit:
+            self.env.cr.commit()
+    
+    def _run(self, auto_commit=True):
+        """Render the export of this job, retrying on failure"""
+        self.ensure_one()
+        self.write({
+            'state': 'running',
+            'phase': "Starting",
+            'progress': 0,
+            'attempt_count': self.attempt_count + 1,
+            'date_started': fields.Datetime.now(),
+            'error_message': False,
+        })
+        if auto_commit:
+            # Release the row lock: the state now keeps other workers away
+            self.env.cr.commit()
+        
+        try:
+            with self.env.cr.savepoint():
+                wizard = self.env['change.request.export.wizard'].with_user(self.user_id).create(
+                    self._prepare_wizard_values()
+                )
+                progress = self._update_progress if auto_commit else None
+                attachment = wizard._export_attachment(progress=progress)
+        except Exception as e:
+            _logger.exception("Word export job %s failed (attempt %s)", self.id, self.attempt_count)
+            self._handle_failure(str(e))
+        else:
+            self.write({
+                'state': 'done',
+                'phase': "Done",
+                'progress': 100,
+                'attachment_id': attachment.id,
+                'date_finished': fields.Datetime.now(),
+            })
+            self._notify_user(
+                "Word export ready",
+                f"{self.name} is ready. Download it from Change Requests > Export Jobs.",
+                'success',
+            )
+        if auto_commit:
+            self.env.cr.commit()
+    
+    def _handle_failure(self, message):
+        """Queue the job again after a delay growing with its attempts, or
+        fail it once they are all used"""
+        self.ensure_one()
+        if self.attempt_count >= self.max_attempts:
+            self.write({
+                'state': 'failed',
+                'error_message': message,
+                'next_attempt': False,
+                'date_finished': fields.Datetime.now(),
+            })
+            self._notify_user("Word export failed", f"{self.name} failed: {message}", 'danger')
+            return
+        next_attempt = fields.Datetime.now() + timedelta(
+            seconds=EXPORT_RETRY_DELAY * 2 ** max(self.attempt_count - 1, 0)
+        )
+        self.write({
+            'state': 'queued',
+            'error_message': message,
+            'next_attempt': next_attempt,
+            'date_finished': False,
+        })
+        self.env.ref(f'{self._module}.ir_cron_process_export_jobs').sudo()._trigger(at=next_attempt)
+    
+    def _prepare_wizard_values(self):
+        """Values of the export wizard reproducing this job"""
+        self.ensure_one()
+        return {
+            'export_mode': self.export_mode,
+            'change_request_id': self.change_request_id.id,
+            'change_request_ids': [Command.set(self.change_request_ids.ids)],
+            'export_domain': self.export_domain,
+            'template_id': self.template_id.id,
+            'output_filename': self.output_filename,
+            'archive_filename': self.archive_filename,
+            'include_effort_breakdown': self.include_effort_breakdown,
+        }
+    
+    def _update_progress(self, phase, done, total):
+        """Record the progress in a separate transaction so it is visible while the job runs"""
+        percentage = 100.0 * done / total if total else 0.0
+        with self.env.registry.cursor() as cr:
+            cr.execute(
+                "UPDATE change_request_export_job SET phase = %s, progress = %s WHERE id = %s",
+                (phase, percentage, self.id),
+            )
+        self.env['ir.cron']._notify_progress(done=done, remaining=total - done)
+    
+    def _notify_user(self, title, message, notification_type):
+        """Pop a notification in the requester's web client"""
+        self.env['bus.bus']._sendone(self.user_id.partner_id, 'simple_notification', {
+            'title': title,
+            'message': message,
+            'type': notification_type,
+            'sticky': True,
+        })
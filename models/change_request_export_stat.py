@@ -0,0 +1,149 @@
+from odoo import models, fields, api, tools
+from odoo.tools import SQL
+
+# Export statistics older than this many days are purged by default
+EXPORT_STAT_RETENTION_DAYS = 30
+
+class ChangeRequestExportStat(models.Model):
+    _name = 'change.request.export.stat'
+    _description = 'Change Request Export Phase Timing'
+    _order = 'date desc, id desc'
+    _log_access = False
+    
+    date = fields.Datetime(
+        string="Date",
+        default=fields.Datetime.now,
+        required=True,
+        index=True
+    )
+    
+    template_id = fields.Many2one(
+        'change.request.template',
+        string="Word Template",
+        index='btree_not_null',
+        ondelete='cascade'
+    )
+    
+    export_mode = fields.Selection([
+        ('single', 'Single Change Request'),
+        ('batch', 'Multiple Change Requests')
+    ], string="Export Mode", required=True)
+    
+    phase = fields.Char(
+        string="Phase",
+        required=True
+    )
+    
+    duration_ms = fields.Float(
+        string="Duration (ms)",
+        help="Time spent in the phase itself, excluding its nested phases"
+    )
+    
+    query_count = fields.Integer(
+        string="Queries"
+    )
+    
+    size = fields.Integer(
+        string="Size (bytes)",
+        help="Size of the data handled by the phase"
+    )
+    
+    document_count = fields.Integer(
+        string="Documents"
+    )
+    
+    run_count = fields.Integer(
+        string="Runs",
+        help="Number of times the phase ran in the export: once per rendered document for the "
+             "rendering phases of a batch export"
+    )
+    
+    @api.autovacuum
+    def _gc_export_stats(self):
+        """Purge the statistics past their retention period"""
+        days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'simple_change_request.export_stat_retention_days', EXPORT_STAT_RETENTION_DAYS
+        ))
+        self.env.cr.execute(SQL(
+            "DELETE FROM %s WHERE date < now() at time zone 'UTC' - make_interval(days => %s)",
+            SQL.identifier(self._table), days,
+        ))
+
+
+class ChangeRequestExportStatReport(models.Model):
+    _name = 'change.request.export.stat.report'
+    _description = 'Change Request Export Timing Analysis'
+    _auto = False
+    _order = 'p95_duration_ms desc'
+    
+    template_id = fields.Many2one(
+        'change.request.template',
+        string="Word Template",
+        readonly=True
+    )
+    
+    export_mode = fields.Selection([
+        ('single', 'Single Change Request'),
+        ('batch', 'Multiple Change Requests')
+    ], string="Export Mode", readonly=True)
+    
+    phase = fields.Char(
+        string="Phase",
+        readonly=True
+    )
+    
+    sample_count = fields.Integer(
+        string="Samples",
+        readonly=True
+    )
+    
+    p50_duration_ms = fields.Float(
+        string="p50 (ms)",
+        readonly=True,
+        aggregator='max'
+    )
+    
+    p95_duration_ms = fields.Float(
+        string="p95 (ms)",
+        readonly=True,
+        aggregator='max'
+    )
+    
+    avg_query_count = fields.Float(
+        string="Avg. Queries",
+        readonly=True,
+        aggregator='avg'
+    )
+    
+    avg_size = fields.Float(
+        string="Avg. Size (bytes)",
+        readonly=True,
+        aggregator='avg'
+    )
+    
+    def init(self):
+        """Percentiles of the phase durations per template and export mode.
+        
+        A batch export times its phases over all its documents: durations,
+        queries and sizes are divided by the number of runs of the phase, so
+        that every sample stands for a single run.
+        """
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(SQL("""
+            CREATE OR REPLACE VIEW %s AS (
+                SELECT MIN(stat.id) AS id,
+                       stat.template_id,
+                       stat.export_mode,
+                       stat.phase,
+                       COUNT(*) AS sample_count,
+                       percentile_cont(0.5) WITHIN GROUP (ORDER BY stat.duration_ms / stat.runs) AS p50_duration_ms,
+                       percentile_cont(0.95) WITHIN GROUP (ORDER BY stat.duration_ms / stat.runs) AS p95_duration_ms,
+                       AVG(stat.query_count::float / stat.runs) AS avg_query_count,
+                       AVG(stat.size::float / stat.runs) AS avg_size
+                  FROM (
+                        SELECT *, GREATEST(run_count, 1) AS runs
+                          FROM change_request_export_stat
+                       ) stat
+              GROUP BY stat.template_id, stat.export_mode, stat.phase
+            )
+        """, SQL.identifier(self._table)))
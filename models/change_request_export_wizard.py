@@ -1,27 +1,57 @@
-from odoo import models, fields, api
+import odoo
+from odoo import models, fields, api, Command
 from odoo.exceptions import UserError
+from odoo.tools import config
+from odoo.tools.safe_eval import safe_eval
 import base64
-import os
-from docxtpl import DocxTemplate
-from io import BytesIO
+import hashlib
+import json
+import logging
+import shutil
+import zipfile
+
+from ..tools import export_backends
+from ..tools.export_metrics import ExportTimer
+from ..tools.template_cache import template_cache, DEFAULT_MAX_BYTES
+from .simple_change_request import BASIC_EXPORT_VARIABLES
+
+_logger = logging.getLogger(__name__)
+
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+EXPORT_FORMAT = 'docx'
+
+# Number of generated exports kept per change request by default
+EXPORT_RETENTION = 3
 
 class ChangeRequestExportWizard(models.TransientModel):
     _name = 'change.request.export.wizard'
     _description = 'Change Request Export Wizard'
     
+    export_mode = fields.Selection([
+        ('single', 'Single Change Request'),
+        ('batch', 'Multiple Change Requests')
+    ], string="Export Mode", default='single', required=True)
+    
     change_request_id = fields.Many2one(
         'simple.change.request',
-        string="Change Request",
-        required=True
+        string="Change Request"
     )
     
-    template_file = fields.Binary(
-        string="Word Template",
-        help="Upload a Word template (.docx) file for mail merge"
+    change_request_ids = fields.Many2many(
+        'simple.change.request',
+        string="Change Requests",
+        help="Change requests to export in batch mode"
     )
     
-    template_filename = fields.Char(
-        string="Template Filename"
+    export_domain = fields.Char(
+        string="Domain",
+        help="Domain selecting the change requests to export when none are picked explicitly"
+    )
+    
+    template_id = fields.Many2one(
+        'change.request.template',
+        string="Word Template",
+        help="Word template (.docx) used for mail merge"
     )
     
     output_filename = fields.Char(
@@ -29,6 +59,11 @@ class ChangeRequestExportWizard(models.TransientModel):
         default="Change_Request_{}.docx"
     )
     
+    archive_filename = fields.Char(
+        string="Archive Filename",
+        default="Change_Requests.zip"
+    )
+    
     include_effort_breakdown = fields.Boolean(
         string="Include Effort Breakdown",
         default=True,
@@ -51,231 +86,379 @@ class ChangeRequestExportWizard(models.TransientModel):
     def action_export_to_word(self):
         """Export change request to Word document"""
         self.ensure_one()
+        return self._get_download_action(self._export_attachment())
+    
+    def action_export_in_background(self):
+        """Queue the export as a background job instead of rendering it now"""
+        self.ensure_one()
+        self._get_export_records()  # validate the selection before queueing
+        self._check_export_template()
+        job = self.env['change.request.export.job'].create(self._prepare_export_job_values())
+        job._trigger_processing()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'info',
+                'message': f"{job.name} has been queued. You will be notified when it is ready to download.",
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
+    
+    def _check_export_template(self):
+        # Templates uploaded before their manifest was checked may be unusable
+        if self.template_id.template_error:
+            raise UserError(f"The Word template {self.template_id.name} cannot be used: {self.template_id.template_error}")
+    
+    def _prepare_export_job_values(self):
+        """Values of the background export job reproducing this wizard"""
+        return {
+            'export_mode': self.export_mode,
+            'change_request_id': self.change_request_id.id,
+            'change_request_ids': [Command.set(self.change_request_ids.ids)],
+            'export_domain': self.export_domain,
+            'template_id': self.template_id.id,
+            'output_filename': self.output_filename,
+            'archive_filename': self.archive_filename,
+            'include_effort_breakdown': self.include_effort_breakdown,
+        }
+    
+    def _export_attachment(self, progress=None):
+        """Render the export and return the resulting attachment.
         
-        if not self.template_file:
+        ``progress`` is an optional callable receiving the current phase
+        and the number of documents done and to do. The duration, query
+        count and size of every phase of the export are logged and stored
+        as export statistics.
+        """
+        self.ensure_one()
+        timer = ExportTimer(self.env.cr)
+        self._check_export_template()
+        
+        if self.export_mode == 'batch':
+            # Render every selected change request into one ZIP archive
+            attachment = self._create_batch_word_documents(progress, timer)
+            self._record_export_timing(timer)
+            return attachment
+        
+        if not self.change_request_id:
+            raise UserError("Please select a change request to export.")
+        
+        # Nothing changed since the last identical export: reuse it
+        with timer.phase('cache_lookup'):
+            cached = self._find_cached_exports(self.change_request_id)[self.change_request_id]
+        if cached:
+            self._report_progress(progress, "Done", 1, 1)
+            attachment = cached
+        elif not self.template_id:
             # Create a basic Word document without template
-            return self._create_basic_word_document()
+            attachment = self._create_basic_word_document(progress, timer)
         else:
             # Use the uploaded template for mail merge
-            return self._create_template_word_document()
+            attachment = self._create_template_word_document(progress, timer)
+        timer.document_count = 1
+        self._record_export_timing(timer)
+        return attachment
     
-    def _create_basic_word_document(self):
+    def _create_basic_word_document(self, progress=None, timer=None):
         """Create a basic Word document without template"""
+        timer = timer or ExportTimer(self.env.cr)
         try:
-            from docx import Document
-            from docx.shared import Inches
-            from docx.enum.text import WD_ALIGN_PARAGRAPH
-            
-            # Create a new document
-            doc = Document()
-            
-            # Add title
-            title = doc.add_heading('Change Request', 0)
-            title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            # Add basic information
-            doc.add_heading('Basic Information', level=1)
-            
-            # Create a table for basic info
-            table = doc.add_table(rows=1, cols=2)
-            table.style = 'Table Grid'
-            hdr_cells = table.rows[0].cells
-            hdr_cells[0].text = 'Field'
-            hdr_cells[1].text = 'Value'
-            
-            # Add basic information rows
-            basic_info = [
-                ('Project Name', self.change_request_id.project_name or ''),
-                ('Change Number', self.change_request_id.change_number or ''),
-                ('Change Request Date', str(self.change_request_id.change_request_date) if self.change_request_id.change_request_date else ''),
-                ('Requester', self.change_request_id.requester_id.name if self.change_request_id.requester_id else ''),
-                ('Department', self.change_request_id.department or ''),
-                ('Request Type', dict(self.change_request_id._fields['request_type'].selection).get(self.change_request_id.request_type, '')),
-                ('Priority', dict(self.change_request_id._fields['priority'].selection).get(self.change_request_id.priority, '')),
-                ('Expected Completion', str(self.change_request_id.expected_completion) if self.change_request_id.expected_completion else ''),
-            ]
-            
-            for field, value in basic_info:
-                row_cells = table.add_row().cells
-                row_cells[0].text = field
-                row_cells[1].text = value
-            
-            # Add problem statement
-            if self.change_request_id.problem_statement:
-                doc.add_heading('Problem Statement', level=1)
-                doc.add_paragraph(self.change_request_id.problem_statement)
-            
-            # Add change description
-            if self.change_request_id.change_description:
-                doc.add_heading('Change Description', level=1)
-                # Convert HTML to plain text for basic document
-                import re
-                clean_text = re.sub('<[^<]+?>', '', self.change_request_id.change_description)
-                doc.add_paragraph(clean_text)
-            
-            # Add acceptance criteria
-            if self.change_request_id.acceptance_criteria:
-                doc.add_heading('Acceptance Criteria', level=1)
-                doc.add_paragraph(self.change_request_id.acceptance_criteria)
-            
-            # Add reason and benefits
-            if self.change_request_id.reason_for_change or self.change_request_id.benefits_of_change:
-                doc.add_heading('Reason and Benefits', level=1)
-                if self.change_request_id.reason_for_change:
-                    doc.add_heading('Reason for Change', level=2)
-                    doc.add_paragraph(self.change_request_id.reason_for_change)
-                if self.change_request_id.benefits_of_change:
-                    doc.add_heading('Benefits of Change', level=2)
-                    doc.add_paragraph(self.change_request_id.benefits_of_change)
-            
-            # Add schedule and cost
-            if self.change_request_id.delivery_timeline or self.change_request_id.cost_estimation:
-                doc.add_heading('Schedule and Cost', level=1)
-                if self.change_request_id.delivery_timeline:
-                    doc.add_heading('Delivery Timeline', level=2)
-                    doc.add_paragraph(self.change_request_id.delivery_timeline)
-                if self.change_request_id.cost_estimation:
-                    doc.add_heading('Cost Estimation', level=2)
-                    doc.add_paragraph(self.change_request_id.cost_estimation)
-            
-            # Add assumptions and payment
-            if self.change_request_id.assumptions or self.change_request_id.payment_milestones:
-                doc.add_heading('Assumptions and Payment', level=1)
-                if self.change_request_id.assumptions:
-                    doc.add_heading('Assumptions', level=2)
-                    doc.add_paragraph(self.change_request_id.assumptions)
-                if self.change_request_id.payment_milestones:
-                    doc.add_heading('Payment Milestones', level=2)
-                    doc.add_paragraph(self.change_request_id.payment_milestones)
-            
-            # Add effort breakdown if requested
-            if self.include_effort_breakdown and self.change_request_id.effort_breakdown_ids:
-                doc.add_heading('Effort Breakdown', level=1)
-                
-                # Create effort breakdown table
-                effort_table = doc.add_table(rows=1, cols=4)
-                effort_table.style = 'Table Grid'
-                effort_hdr_cells = effort_table.rows[0].cells
-                effort_hdr_cells[0].text = 'No.'
-                effort_hdr_cells[1].text = 'Expected Task'
-                effort_hdr_cells[2].text = 'Effort (Days)'
-                effort_hdr_cells[3].text = 'Remarks'
-                
-                for effort_line in self.change_request_id.effort_breakdown_ids:
-                    row_cells = effort_table.add_row().cells
-                    row_cells[0].text = effort_line.task_number or ''
-                    row_cells[1].text = effort_line.expected_task or ''
-                    row_cells[2].text = str(effort_line.effort_days) if effort_line.effort_days else ''
-                    row_cells[3].text = effort_line.remarks or ''
-                
-                # Add total effort
-                doc.add_paragraph(f'Total Effort: {self.change_request_id.total_effort_days} days')
-            
-            # Save the document
-            output = BytesIO()
-            doc.save(output)
-            output.seek(0)
+            self._report_progress(progress, "Collecting data", 0, 1)
+            with timer.phase('collect'):
+                context = self._prepare_template_context(variables=BASIC_EXPORT_VARIABLES)
+            backend = self._get_export_backend()
+            with export_backends.spooled_output() as output:
+                self._report_progress(progress, "Rendering", 0, 1)
+                backend.render(context, output, timer)
+                self._report_progress(progress, "Storing", 1, 1)
+                return self._create_export_attachment(self.change_request_id, output, timer)
             
-            # Create attachment
-            filename = self.output_filename.format(self.change_request_id.change_number or self.change_request_id.name)
-            attachment = self.env['ir.attachment'].create({
-                'name': filename,
-                'type': 'binary',
-                'datas': base64.b64encode(output.getvalue()),
-                'res_model': 'simple.change.request',
-                'res_id': self.change_request_id.id,
-            })
-            
-            return {
-                'type': 'ir.actions.act_url',
-                'url': f'/web/content/{attachment.id}?download=true',
-                'target': 'self',
-            }
-            
-        except ImportError:
-            raise UserError("Please install python-docx library: pip install python-docx")
+        except UserError:
+            raise
+        except export_backends.ExportBackendUnavailable as e:
+            raise UserError(str(e))
         except Exception as e:
-            raise UserError(f"Error creating Word document: {str(e)}")
+            phase = self._log_export_failure(timer)
+            raise UserError(f"Error creating Word document ({phase} phase): {str(e)}")
     
-    def _create_template_word_document(self):
+    def _create_template_word_document(self, progress=None, timer=None):
         """Create Word document using uploaded template"""
+        timer = timer or ExportTimer(self.env.cr)
         try:
-            # Decode template file
-            template_data = base64.b64decode(self.template_file)
-            template_stream = BytesIO(template_data)
-            
-            # Load template
-            doc = DocxTemplate(template_stream)
-            
-            # Prepare context data
-            context = self._prepare_template_context()
-            
-            # Render template
-            doc.render(context)
+            self._report_progress(progress, "Collecting data", 0, 1)
+            with timer.phase('collect'):
+                context = self._prepare_template_context(variables=self.template_id._get_variables())
+            # The template is only decoded and parsed when it isn't cached yet
+            self._configure_template_cache()
+            backend = self._get_export_backend(
+                lambda: base64.b64decode(self.template_id.with_context(bin_size=False).template_file)
+            )
+            with export_backends.spooled_output() as output:
+                self._report_progress(progress, "Rendering", 0, 1)
+                backend.render(context, output, timer)
+                self._report_progress(progress, "Storing", 1, 1)
+                return self._create_export_attachment(self.change_request_id, output, timer)
             
-            # Save the document
-            output = BytesIO()
-            doc.save(output)
-            output.seek(0)
+        except UserError:
+            raise
+        except export_backends.ExportBackendUnavailable as e:
+            raise UserError(str(e))
+        except Exception as e:
+            phase = self._log_export_failure(timer)
+            raise UserError(f"Error creating Word document from template ({phase} phase): {str(e)}")
+    
+    def _create_batch_word_documents(self, progress=None, timer=None):
+        """Render all selected change requests in parallel into a single ZIP"""
+        timer = timer or ExportTimer(self.env.cr)
+        change_requests = self._get_export_records()
+        if not change_requests:
+            raise UserError("There are no change requests to export.")
+        
+        try:
+            total = timer.document_count = len(change_requests)
+            self._report_progress(progress, "Collecting data", 0, total)
+            template = self.template_id.with_context(bin_size=False)
+            with timer.phase('decode') as phase:
+                template_data = base64.b64decode(template.template_file) if template else None
+                phase['size'] += len(template_data or b'')
+            variables = template._get_variables() if template else BASIC_EXPORT_VARIABLES
+            self._configure_template_cache()
             
-            # Create attachment
-            filename = self.output_filename.format(self.change_request_id.change_number or self.change_request_id.name)
-            attachment = self.env['ir.attachment'].create({
-                'name': filename,
-                'type': 'binary',
-                'datas': base64.b64encode(output.getvalue()),
-                'res_model': 'simple.change.request',
-                'res_id': self.change_request_id.id,
-            })
+            # Only render the requests without an up-to-date export
+            with timer.phase('cache_lookup'):
+                cached = self._find_cached_exports(change_requests)
+            to_render = change_requests.filtered(lambda cr: not cached[cr])
+            # Contexts are built as the documents are rendered, a batch of
+            # change requests at a time, never all at once
+            contexts = self._iter_timed_contexts(
+                to_render._iter_template_contexts(variables, self.include_effort_breakdown), timer,
+            )
+            documents = export_backends.render_documents(
+                self._get_export_backend(template_data),
+                contexts,
+                max_workers=self._get_export_worker_count(),
+                timer=timer,
+            )
             
-            return {
-                'type': 'ir.actions.act_url',
-                'url': f'/web/content/{attachment.id}?download=true',
-                'target': 'self',
-            }
+            # Stream each document into the archive as soon as it is rendered
+            with export_backends.spooled_output() as archive:
+                used_names = set()
+                with timer.phase('archive'), \
+                        zipfile.ZipFile(archive, 'w', compression=zipfile.ZIP_STORED) as zip_file:
+                    for done, cr in enumerate(change_requests):
+                        self._report_progress(progress, "Rendering", done, total)
+                        filename = self._get_unique_filename(cr, used_names)
+                        with zip_file.open(filename, 'w', force_zip64=True) as entry:
+                            if cached[cr]:
+                                entry.write(cached[cr].raw)
+                            else:
+                                shutil.copyfileobj(next(documents), entry)
+                self._report_progress(progress, "Storing", total, total)
+                return self._create_attachment_from_stream({
+                    'name': self.archive_filename or 'Change_Requests.zip',
+                    'mimetype': 'application/zip',
+                }, archive, timer)
             
-        except ImportError:
-            raise UserError("Please install docxtpl library: pip install docxtpl")
+        except UserError:
+            raise
+        except export_backends.ExportBackendUnavailable as e:
+            raise UserError(str(e))
         except Exception as e:
-            raise UserError(f"Error creating Word document from template: {str(e)}")
+            phase = self._log_export_failure(timer)
+            raise UserError(f"Error creating Word documents ({phase} phase): {str(e)}")
+    
+    def _record_export_timing(self, timer):
+        """Log the phase timings of a successful export as one structured
+        line and store them as export statistics"""
+        phases = timer.summary()
+        _logger.info("export_timing %s", json.dumps({
+            'mode': self.export_mode,
+            'template_id': self.template_id.id,
+            'document_count': timer.document_count,
+            'phases': phases,
+        }))
+        self.env['change.request.export.stat'].sudo().create([{
+            'template_id': self.template_id.id,
+            'export_mode': self.export_mode,
+            'document_count': timer.document_count,
+            'phase': phase['phase'],
+            'duration_ms': phase['duration_ms'],
+            'query_count': phase['query_count'],
+            'size': phase['size'],
+            'run_count': phase['count'],
+        } for phase in phases])
+    
+    @api.model
+    def _log_export_failure(self, timer):
+        """Log the failure of an export, return the name of the failed phase"""
+        phase = timer.failed_phase or 'export'
+        _logger.exception("Word export failed in phase %s: %s", phase, json.dumps(timer.summary()))
+        return phase
+    
+    @api.model
+    def _report_progress(self, progress, phase, done, total):
+        if progress:
+            progress(phase, done, total)
+    
+    def _get_export_records(self):
+        """Return the change requests targeted by the export"""
+        if self.export_mode != 'batch':
+            return self.change_request_id
+        if self.change_request_ids:
+            return self.change_request_ids
+        if self.export_domain:
+            return self.env['simple.change.request'].search(safe_eval(self.export_domain))
+        return self.env['simple.change.request']
     
-    def _prepare_template_context(self):
-        """Prepare context data for template rendering"""
-        cr = self.change_request_id
+    @api.model
+    def _iter_timed_contexts(self, contexts, timer):
+        """Template contexts of ``(record, context)`` pairs, timed as the
+        collect phase while they are produced"""
+        contexts = iter(contexts)
+        while True:
+            with timer.phase('collect'):
+                item = next(contexts, None)
+            if item is None:
+                return
+            yield item[1]
+    
+    def _get_export_worker_count(self):
+        """Size of the rendering process pool for batch exports.
         
-        # Basic information
-        context = {
-            'project_name': cr.project_name or '',
-            'change_number': cr.change_number or '',
-            'change_request_date': str(cr.change_request_date) if cr.change_request_date else '',
-            'requester_name': cr.requester_id.name if cr.requester_id else '',
-            'department': cr.department or '',
-            'request_type': dict(cr._fields['request_type'].selection).get(cr.request_type, ''),
-            'priority': dict(cr._fields['priority'].selection).get(cr.priority, ''),
-            'expected_completion': str(cr.expected_completion) if cr.expected_completion else '',
-            'problem_statement': cr.problem_statement or '',
-            'change_description': cr.change_description or '',
-            'acceptance_criteria': cr.acceptance_criteria or '',
-            'reason_for_change': cr.reason_for_change or '',
-            'benefits_of_change': cr.benefits_of_change or '',
-            'delivery_timeline': cr.delivery_timeline or '',
-            'cost_estimation': cr.cost_estimation or '',
-            'assumptions': cr.assumptions or '',
-            'payment_milestones': cr.payment_milestones or '',
-            'total_effort_days': cr.total_effort_days or 0,
-        }
+        Forking a multi-threaded (or evented) server may copy locks held by
+        its other threads, deadlocking the children: only the workers of
+        the prefork server, single-threaded, render in a pool.
+        """
+        if not config['workers'] or odoo.evented:
+            return 1
+        max_workers = self.env['ir.config_parameter'].sudo().get_param(
+            'simple_change_request.export_max_workers'
+        )
+        return int(max_workers) if max_workers else export_backends.default_worker_count()
+    
+    def _get_export_backend(self, template_data=None):
+        """Export engine rendering the documents of this wizard.
+        
+        ``template_data`` is the template bytes, or a callable returning them
+        when the export runs in this process.
+        """
+        if not self.template_id:
+            return export_backends.get_backend('basic')(
+                include_effort_breakdown=self.include_effort_breakdown,
+            )
+        return export_backends.get_backend('template')(
+            template_data,
+            checksum=self.template_id.checksum,
+            include_effort_breakdown=self.include_effort_breakdown,
+        )
+    
+    def _configure_template_cache(self):
+        """Apply the configured memory budget to this worker's template cache"""
+        max_bytes = self.env['ir.config_parameter'].sudo().get_param(
+            'simple_change_request.template_cache_max_bytes'
+        )
+        template_cache.resize(int(max_bytes) if max_bytes else DEFAULT_MAX_BYTES)
+    
+    def _get_output_filename(self, change_request):
+        """Output filename of the document exported for a change request"""
+        return (self.output_filename or "Change_Request_{}.docx").format(
+            change_request.change_number or change_request.name
+        )
+    
+    def _get_unique_filename(self, change_request, used_names):
+        """Output filename made unique within an archive"""
+        filename = self._get_output_filename(change_request)
+        if filename in used_names:
+            stem, dot, extension = filename.rpartition('.')
+            filename = f"{stem}_{change_request.id}{dot}{extension}" if dot else f"{filename}_{change_request.id}"
+        used_names.add(filename)
+        return filename
+    
+    def _create_export_attachment(self, change_request, stream, timer=None):
+        """Store an exported document as an attachment of its change request"""
+        attachment = self._create_attachment_from_stream({
+            'name': self._get_output_filename(change_request),
+            'mimetype': DOCX_MIMETYPE,
+            'res_model': 'simple.change.request',
+            'res_id': change_request.id,
+            'export_render_key': self._get_render_key(change_request),
+        }, stream, timer)
+        self._evict_superseded_exports(change_request)
+        return attachment
+    
+    def _get_render_key(self, change_request):
+        """Content address of the document exported for a change request.
         
-        # Effort breakdown table
-        if self.include_effort_breakdown and cr.effort_breakdown_ids:
-            effort_breakdown = []
-            for line in cr.effort_breakdown_ids:
-                effort_breakdown.append({
-                    'task_number': line.task_number or '',
-                    'expected_task': line.expected_task or '',
-                    'effort_days': line.effort_days or 0,
-                    'remarks': line.remarks or '',
-                    'task_category': dict(line._fields['task_category'].selection).get(line.task_category, ''),
-                })
-            context['effort_breakdown'] = effort_breakdown
+        Any change to the request, to its effort lines, to the template or to
+        the export options gives a different key.
+        """
+        payload = json.dumps([
+            EXPORT_FORMAT,
+            change_request.id,
+            str(change_request.write_date),
+            str(change_request.project_id.write_date),
+            sorted((line.id, str(line.write_date)) for line in change_request.effort_breakdown_ids),
+            self.template_id.checksum or '',
+            self.include_effort_breakdown,
+            self._get_output_filename(change_request),
+        ])
+        return hashlib.sha1(payload.encode()).hexdigest()
+    
+    def _find_cached_exports(self, change_requests):
+        """Map each change request to the existing export attachment identical
+        to the one this wizard would render (or an empty recordset)"""
+        keys = {cr: self._get_render_key(cr) for cr in change_requests}
+        attachments = self.env['ir.attachment'].search([
+            ('res_model', '=', 'simple.change.request'),
+            ('res_id', 'in', change_requests.ids),
+            ('export_render_key', 'in', list(keys.values())),
+        ])
+        by_key = {attachment.export_render_key: attachment for attachment in attachments}
+        return {cr: by_key.get(key, self.env['ir.attachment']) for cr, key in keys.items()}
+    
+    def _evict_superseded_exports(self, change_request):
+        """Only keep the most recent exports of a change request, and those
+        background export jobs hand out"""
+        retention = int(self.env['ir.config_parameter'].sudo().get_param(
+            'simple_change_request.export_retention', EXPORT_RETENTION
+        ))
+        superseded = self.env['ir.attachment'].search([
+            ('res_model', '=', 'simple.change.request'),
+            ('res_id', '=', change_request.id),
+            ('export_render_key', '!=', False),
+        ], order='id desc', offset=retention)
+        downloadable = self.env['change.request.export.job'].sudo().search([
+            ('attachment_id', 'in', superseded.ids),
+        ]).attachment_id
+        (superseded - downloadable).unlink()
+    
+    def _create_attachment_from_stream(self, vals, stream, timer=None):
+        """Create a binary attachment from a rendered file.
+        
+        The content is handed over as ``raw`` bytes read straight from the
+        file, so only that single copy is ever held in memory (no base64).
+        """
+        timer = timer or ExportTimer(self.env.cr)
+        with timer.phase('attachment') as phase:
+            stream.seek(0)
+            raw = stream.read()
+            phase['size'] += len(raw)
+            return self.env['ir.attachment'].create(dict(vals, type='binary', raw=raw))
+    
+    def _get_download_action(self, attachment):
+        """Action downloading the given attachment"""
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/web/content/{attachment.id}?download=true',
+            'target': 'self',
+        }
+    
+    def _prepare_template_context(self, change_request=None, variables=None):
+        """Prepare context data for template rendering.
         
-        return context
+        When ``variables`` is given, only those template variables are
+        computed and only the fields they need are read.
+        """
+        cr = change_request or self.change_request_id
+        return next(cr._iter_template_contexts(variables, self.include_effort_breakdown))[1]
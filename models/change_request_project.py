@@ -0,0 +1,141 @@
+from odoo import models, fields, api
+from odoo.osv import expression
+from odoo.tools import SQL, escape_psql
+from psycopg2.errors import UniqueViolation
+
+class ChangeRequestProject(models.Model):
+    _name = 'change.request.project'
+    _description = 'Change Request Project'
+    _order = 'name, id'
+    
+    name = fields.Char(
+        string="Project Name",
+        required=True,
+        index='trigram'
+    )
+    
+    active = fields.Boolean(
+        string="Active",
+        default=True
+    )
+    
+    change_request_ids = fields.One2many(
+        'simple.change.request',
+        'project_id',
+        string="Change Requests"
+    )
+    
+    # Rollup counters, maintained by _refresh_rollups()
+    draft_count = fields.Integer(string="Draft", readonly=True, default=0)
+    submitted_count = fields.Integer(string="Submitted", readonly=True, default=0)
+    approved_count = fields.Integer(string="Approved", readonly=True, default=0)
+    rejected_count = fields.Integer(string="Rejected", readonly=True, default=0)
+    completed_count = fields.Integer(string="Completed", readonly=True, default=0)
+    
+    total_effort_days = fields.Float(
+        string="Total Effort (Days)",
+        readonly=True,
+        default=0.0
+    )
+    
+    next_expected_completion = fields.Date(
+        string="Next Expected Completion",
+        readonly=True,
+        help="Earliest expected completion date of the project's open change requests"
+    )
+    
+    _sql_constraints = [
+        ('name_unique', 'unique(name)', 'A project with this name already exists.'),
+    ]
+    
+    def _refresh_rollups(self):
+        """Recompute the counters of these projects only.
+        
+        A single aggregate restricted to the given projects (through the
+        index on simple_change_request.project_id) updates all of them in one
+        statement, so the cost depends on the touched projects, never on the
+        size of the whole table.
+        """
+        projects = self.exists()
+        if not projects:
+            return
+        self.env['simple.change.request'].flush_model(
+            ['project_id', 'state', 'total_effort_days', 'expected_completion']
+        )
+        self.env.cr.execute(SQL("""
+            UPDATE change_request_project project
+               SET draft_count = rollup.draft_count,
+                   submitted_count = rollup.submitted_count,
+                   approved_count = rollup.approved_count,
+                   rejected_count = rollup.rejected_count,
+                   completed_count = rollup.completed_count,
+                   total_effort_days = rollup.total_effort_days,
+                   next_expected_completion = rollup.next_expected_completion
+              FROM (
+                    SELECT p.id,
+                           COUNT(cr.id) FILTER (WHERE cr.state = 'draft') AS draft_count,
+                           COUNT(cr.id) FILTER (WHERE cr.state = 'submitted') AS submitted_count,
+                           COUNT(cr.id) FILTER (WHERE cr.state = 'approved') AS approved_count,
+                           COUNT(cr.id) FILTER (WHERE cr.state = 'rejected') AS rejected_count,
+                           COUNT(cr.id) FILTER (WHERE cr.state = 'completed') AS completed_count,
+                           COALESCE(SUM(cr.total_effort_days), 0) AS total_effort_days,
+                           MIN(cr.expected_completion) FILTER (
+                               WHERE cr.state NOT IN ('completed', 'rejected')
+                           ) AS next_expected_completion
+                      FROM change_request_project p
+                 LEFT JOIN simple_change_request cr ON cr.project_id = p.id
+                     WHERE p.id IN %s
+                  GROUP BY p.id
+                   ) rollup
+             WHERE project.id = rollup.id
+        """, tuple(projects.ids)))
+        projects.invalidate_recordset([
+            'draft_count', 'submitted_count', 'approved_count', 'rejected_count',
+            'completed_count', 'total_effort_days', 'next_expected_completion',
+        ])
+    
+    @api.model
+    def _get_or_create_by_name(self, names):
+        """Map each project name to its project, creating the missing ones.
+        
+        Names are matched ignoring case and surrounding whitespace, so that
+        typing variants of the same name end up in one project.
+        """
+        normalized = {name: ' '.join(name.split()) for name in names if name and name.strip()}
+        keys = {clean.lower(): clean for clean in normalized.values()}
+        by_key = self._search_by_names(keys.values())
+        for key, clean in keys.items():
+            if key in by_key:
+                continue
+            try:
+                with self.env.cr.savepoint():
+                    by_key[key] = self.create({'name': clean})
+            except UniqueViolation:
+                # Created meanwhile by a concurrent transaction: use it if it
+                # is visible here, otherwise the violation is reported
+                by_key.update(self._search_by_names([clean]))
+                if key not in by_key:
+                    raise
+        return {name: by_key[clean.lower()] for name, clean in normalized.items()}
+    
+    @api.model
+    def _search_by_names(self, names):
+        """Projects with one of these names, ignoring case, by lowercase name"""
+        if not names:
+            return {}
+        projects = self.with_context(active_test=False).search(expression.OR([
+            [('name', '=ilike', escape_psql(name))] for name in names
+        ]))
+        return {project.name.lower(): project for project in projects}
+    
+    def action_view_change_requests(self):
+        """Open the change requests of the project"""
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': self.name,
+            'res_model': 'simple.change.request',
+            'view_mode': 'kanban,list,form',
+            'domain': [('project_id', '=', self.id)],
+            'context': {'default_project_id': self.id},
+        }
@@ -0,0 +1,186 @@
+from odoo import models, fields, api, Command
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+from odoo.tools.safe_eval import safe_eval
+
+from ..tools import register_writer
+from ..tools.export_backends import spooled_output
+
+# Number of register rows (effort lines) read per query
+REGISTER_BATCH_SIZE = 2000
+
+# Columns of the register: header, then the change request or effort line
+# field each one shows
+REGISTER_COLUMNS = [
+    ("Change Number", 'request', 'change_number'),
+    ("Request Title", 'request', 'name'),
+    ("Project", 'request', 'project_id'),
+    ("Department", 'request', 'department'),
+    ("Requester", 'request', 'requester_id'),
+    ("Request Type", 'request', 'request_type'),
+    ("Priority", 'request', 'priority'),
+    ("Status", 'request', 'state'),
+    ("Change Request Date", 'request', 'change_request_date'),
+    ("Expected Completion", 'request', 'expected_completion'),
+    ("Total Effort (Days)", 'request', 'total_effort_days'),
+    ("Task No.", 'line', 'task_number'),
+    ("Expected Task", 'line', 'expected_task'),
+    ("Task Category", 'line', 'task_category'),
+    ("Effort (Days)", 'line', 'effort_days'),
+    ("Remarks", 'line', 'remarks'),
+]
+
+class ChangeRequestRegisterExportWizard(models.TransientModel):
+    _name = 'change.request.register.export.wizard'
+    _description = 'Change Request Register Export'
+    
+    change_request_ids = fields.Many2many(
+        'simple.change.request',
+        string="Change Requests",
+        help="Change requests in the register; leave empty to use the domain"
+    )
+    
+    export_domain = fields.Char(
+        string="Domain",
+        default='[]',
+        help="Domain selecting the change requests in the register when none are picked explicitly"
+    )
+    
+    file_format = fields.Selection([
+        ('xlsx', 'Excel (XLSX)'),
+        ('csv', 'CSV')
+    ], string="Format", default='xlsx', required=True)
+    
+    output_filename = fields.Char(
+        string="Output Filename",
+        default="Change_Request_Register"
+    )
+    
+    @api.model
+    def default_get(self, fields_list):
+        """Select the change requests the wizard was opened from"""
+        res = super().default_get(fields_list)
+        if (
+            'change_request_ids' in fields_list and not res.get('change_request_ids')
+            and self.env.context.get('active_model') == 'simple.change.request'
+            and self.env.context.get('active_ids')
+        ):
+            res['change_request_ids'] = [Command.set(self.env.context['active_ids'])]
+        return res
+    
+    def action_export_register(self):
+        """Export the register and download it"""
+        self.ensure_one()
+        attachment = self._export_register()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/web/content/{attachment.id}?download=true',
+            'target': 'self',
+        }
+    
+    def _get_register_domain(self):
+        if self.change_request_ids:
+            return [('id', 'in', self.change_request_ids.ids)]
+        return safe_eval(self.export_domain or '[]')
+    
+    def _export_register(self):
+        """Write the register into a temporary file, then into an attachment.
+        
+        The rows stream into the file with flat memory, but ir.attachment
+        only takes bytes: the finished file is held in memory once, when it
+        is attached.
+        """
+        if self.file_format == 'xlsx':
+            try:
+                import openpyxl  # noqa: F401
+            except ImportError:
+                raise UserError("Please install openpyxl library: pip install openpyxl")
+        mimetype, extension = register_writer.REGISTER_FORMATS[self.file_format]
+        header = [title for title, _source, _fname in REGISTER_COLUMNS]
+        with spooled_output() as output:
+            count = register_writer.write_register(
+                self.file_format, output, header, self._iter_register_rows(self._get_register_domain()),
+            )
+            if not count:
+                raise UserError("No change request matches the selection.")
+            output.seek(0)
+            # Private to its creator, purged by _gc_register_attachments
+            return self.env['ir.attachment'].create({
+                'name': f"{self.output_filename or 'Change_Request_Register'}.{extension}",
+                'mimetype': mimetype,
+                'type': 'binary',
+                'raw': output.read(),
+                'res_model': self._name,
+            })
+    
+    @api.autovacuum
+    def _gc_register_attachments(self):
+        """Delete the exported registers of past days"""
+        self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('create_date', '<', fields.Datetime.subtract(fields.Datetime.now(), days=1)),
+        ]).unlink()
+    
+    @api.model
+    def _iter_register_rows(self, domain, batch_size=REGISTER_BATCH_SIZE):
+        """Lazily yield the register rows of the change requests matching
+        ``domain``: one per effort line, or a single one for a change
+        request without lines.
+        
+        The rows are read in ``(change request, line)`` keyset order, a
+        batch at a time, and the cache is emptied after each batch: memory
+        stays flat whatever the number of rows. The row comparison spans two
+        tables, so the bound on the change request alone is repeated for
+        PostgreSQL to start each batch from its position in the index.
+        """
+        ChangeRequest = self.env['simple.change.request']
+        Line = self.env['change.request.effort.line']
+        request_fnames = [fname for _title, source, fname in REGISTER_COLUMNS if source == 'request']
+        line_fnames = [fname for _title, source, fname in REGISTER_COLUMNS if source == 'line']
+        labels = {
+            fname: dict(model._fields[fname]._description_selection(self.env))
+            for model, fnames in ((ChangeRequest, request_fnames), (Line, line_fnames))
+            for fname in fnames if model._fields[fname].type == 'selection'
+        }
+        
+        def value(record, fname):
+            field = record._fields[fname]
+            data = record[fname]
+            if field.type == 'many2one':
+                return data.display_name if data else None
+            if field.type == 'selection':
+                return labels[fname].get(data) if data else None
+            return None if data is False and field.type != 'boolean' else data
+        
+        matching = ChangeRequest._search(domain).subselect()
+        position = (0, 0)
+        while True:
+            rows = self.env.execute_query(SQL("""
+                SELECT request.id, COALESCE(line.id, 0)
+                  FROM simple_change_request request
+             LEFT JOIN change_request_effort_line line ON line.change_request_id = request.id
+                 WHERE request.id IN %s
+                   AND request.id >= %s
+                   AND (request.id, COALESCE(line.id, 0)) > (%s, %s)
+              ORDER BY request.id, COALESCE(line.id, 0)
+                 LIMIT %s
+            """, matching, position[0], position[0], position[1], batch_size))
+            if not rows:
+                break
+            
+            requests = ChangeRequest.browse(list(dict.fromkeys(row[0] for row in rows)))
+            requests.fetch(request_fnames)
+            requests.project_id.fetch(['name'])
+            requests.requester_id.partner_id.fetch(['name'])
+            Line.browse([row[1] for row in rows if row[1]]).fetch(line_fnames)
+            for request_id, line_id in rows:
+                records = {'request': ChangeRequest.browse(request_id), 'line': Line.browse(line_id or ())}
+                yield [
+                    value(records[source], fname) if records[source] else None
+                    for _title, source, fname in REGISTER_COLUMNS
+                ]
+            
+            position = rows[-1]
+            self.env.invalidate_all()
+            if len(rows) < batch_size:
+                break
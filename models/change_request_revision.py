@@ -0,0 +1,221 @@
+import base64
+import difflib
+import json
+
+from markupsafe import Markup
+
+from odoo import models, fields, api
+from odoo.tools import html2plaintext
+
+from ..tools import revision_delta
+
+# Change request fields whose versions are kept, and the effort line fields
+# making up the versions of the effort breakdown
+REVISION_FIELDS = ['problem_statement', 'change_description', 'cost_estimation', 'payment_milestones']
+REVISION_LINE_FIELDS = ['task_number', 'expected_task', 'effort_days', 'remarks', 'task_category']
+
+# Name of the effort breakdown in the snapshots
+EFFORT_BREAKDOWN = 'effort_breakdown'
+
+# Every this many revisions, a full snapshot is stored instead of a delta:
+# rebuilding a version never replays more deltas than that
+REVISION_KEYFRAME_INTERVAL = 20
+
+class ChangeRequestRevision(models.Model):
+    _name = 'change.request.revision'
+    _description = 'Change Request Revision'
+    _order = 'change_request_id, revision_number desc'
+    _rec_name = 'revision_number'
+    _log_access = False
+    
+    change_request_id = fields.Many2one(
+        'simple.change.request',
+        string="Change Request",
+        required=True,
+        ondelete='cascade'
+    )
+    
+    revision_number = fields.Integer(
+        string="Revision",
+        required=True
+    )
+    
+    date = fields.Datetime(
+        string="Date",
+        default=fields.Datetime.now,
+        required=True
+    )
+    
+    user_id = fields.Many2one(
+        'res.users',
+        string="User",
+        default=lambda self: self.env.uid
+    )
+    
+    keyframe = fields.Boolean(
+        string="Full Snapshot",
+        help="The revision stores the whole version instead of its changes"
+    )
+    
+    changed_fields = fields.Char(
+        string="Changed"
+    )
+    
+    payload = fields.Binary(
+        string="Payload",
+        attachment=False,
+        prefetch=False,
+        help="Compressed snapshot or delta against the previous revision"
+    )
+    
+    payload_size = fields.Integer(
+        string="Stored Size"
+    )
+    
+    snapshot_size = fields.Integer(
+        string="Version Size",
+        help="Size of the full version this revision stands for"
+    )
+    
+    diff_html = fields.Html(
+        string="Changes",
+        compute='_compute_diff_html',
+        sanitize=False
+    )
+    
+    version_html = fields.Html(
+        string="Version",
+        compute='_compute_version_html',
+        sanitize=False
+    )
+    
+    _sql_constraints = [
+        ('revision_unique', 'unique(change_request_id, revision_number)',
+         'A change request cannot have two revisions with the same number.'),
+    ]
+    
+    def _compute_diff_html(self):
+        labels = {fname: self.env['simple.change.request']._fields[fname].string for fname in REVISION_FIELDS}
+        labels[EFFORT_BREAKDOWN] = "Effort Breakdown"
+        for revision in self:
+            previous = revision._get_version(revision.change_request_id, revision.revision_number - 1)
+            current = revision._get_version(revision.change_request_id, revision.revision_number)
+            tables = []
+            for name, label in labels.items():
+                old, new = self._diff_lines(name, previous.get(name, '')), self._diff_lines(name, current.get(name, ''))
+                if old != new:
+                    tables.append(Markup('<h5>%s</h5>') % label + Markup(difflib.HtmlDiff(wrapcolumn=80).make_table(
+                        old, new, "Previous", "This revision", context=True,
+                    )))
+            revision.diff_html = Markup('').join(tables)
+    
+    def _compute_version_html(self):
+        labels = {fname: self.env['simple.change.request']._fields[fname].string for fname in REVISION_FIELDS}
+        labels[EFFORT_BREAKDOWN] = "Effort Breakdown"
+        for revision in self:
+            version = revision._get_version(revision.change_request_id, revision.revision_number)
+            revision.version_html = Markup('').join(
+                Markup('<h5>%s</h5><pre>%s</pre>') % (label, '\n'.join(self._diff_lines(name, version.get(name, ''))))
+                for name, label in labels.items()
+            )
+    
+    @api.model
+    def _diff_lines(self, name, text):
+        """Readable lines of a versioned text"""
+        if name == 'change_description':
+            text = html2plaintext(text) if text else ''
+        elif name == EFFORT_BREAKDOWN:
+            return [' | '.join(str(value) for value in json.loads(line)) for line in text.splitlines()]
+        return text.splitlines()
+    
+    # Snapshots
+    @api.model
+    def _take_snapshots(self, change_requests):
+        """Current version ``{name: text}`` of each change request, by id"""
+        change_requests.fetch(REVISION_FIELDS)
+        breakdowns = {}
+        for line in self.env['change.request.effort.line'].search_fetch(
+            [('change_request_id', 'in', change_requests.ids)], REVISION_LINE_FIELDS + ['change_request_id'],
+        ):
+            breakdowns.setdefault(line.change_request_id.id, []).append(
+                json.dumps(['' if line[fname] is False else line[fname] for fname in REVISION_LINE_FIELDS])
+            )
+        return {
+            change_request.id: dict(
+                {fname: change_request[fname] or '' for fname in REVISION_FIELDS},
+                **{EFFORT_BREAKDOWN: '\n'.join(breakdowns.get(change_request.id, []))},
+            )
+            for change_request in change_requests
+        }
+    
+    @api.model
+    def _record_revisions(self, change_requests, before):
+        """Store the changes of the change requests since the snapshots
+        ``before`` taken by _take_snapshots, as compressed deltas.
+        
+        A change request without history first gets its previous version
+        as a full snapshot, so that its first revision can be rebuilt.
+        """
+        change_requests = change_requests.exists()
+        if not change_requests:
+            return
+        after = self._take_snapshots(change_requests)
+        last_numbers = dict(self._read_group(
+            [('change_request_id', 'in', change_requests.ids)], ['change_request_id'], ['revision_number:max'],
+        ))
+        vals_list = []
+        for change_request in change_requests:
+            old, new = before.get(change_request.id), after[change_request.id]
+            if old is None or old == new:
+                continue
+            number = last_numbers.get(change_request, 0)
+            if not number:
+                number += 1
+                vals_list.append(self._prepare_revision(change_request, number, new=old))
+            number += 1
+            vals_list.append(self._prepare_revision(change_request, number, old=old, new=new))
+        # Users can read the history, never write it
+        self.sudo().create(vals_list)
+    
+    @api.model
+    def _prepare_revision(self, change_request, number, new, old=None):
+        changed = [name for name, text in new.items() if old is None or text != old.get(name, '')]
+        payload = revision_delta.encode_keyframe(new)
+        keyframe = old is None or number % REVISION_KEYFRAME_INTERVAL == 1
+        if not keyframe:
+            delta = revision_delta.encode_delta(old, new)
+            # Rewrites may make the delta larger than the version itself
+            if len(delta) < len(payload):
+                payload = delta
+            else:
+                keyframe = True
+        return {
+            'change_request_id': change_request.id,
+            'revision_number': number,
+            'keyframe': keyframe,
+            'changed_fields': ', '.join(changed),
+            'payload': base64.b64encode(payload),
+            'payload_size': len(payload),
+            'snapshot_size': revision_delta.snapshot_size(new),
+        }
+    
+    @api.model
+    def _get_version(self, change_request, number):
+        """Version ``{name: text}`` of a change request at a revision,
+        rebuilt from the last full snapshot before it"""
+        if number < 1:
+            return {}
+        keyframe = self.search_fetch([
+            ('change_request_id', '=', change_request.id),
+            ('revision_number', '<=', number),
+            ('keyframe', '=', True),
+        ], ['revision_number'], order='revision_number desc', limit=1)
+        revisions = self.with_context(bin_size=False).search_fetch([
+            ('change_request_id', '=', change_request.id),
+            ('revision_number', '>=', keyframe.revision_number),
+            ('revision_number', '<=', number),
+        ], ['keyframe', 'payload'], order='revision_number')
+        snapshot = {}
+        for revision in revisions:
+            snapshot = revision_delta.apply_payload(snapshot, base64.b64decode(revision.payload), revision.keyframe)
+        return snapshot
@@ -0,0 +1,158 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError, ValidationError
+import base64
+import hashlib
+
+from ..tools import export_backends
+from .simple_change_request import PARAGRAPH_VARIABLES, TEMPLATE_VARIABLES
+
+class ChangeRequestTemplate(models.Model):
+    _name = 'change.request.template'
+    _description = 'Change Request Word Template'
+    _order = 'name, id'
+    
+    name = fields.Char(
+        string="Name",
+        required=True
+    )
+    
+    active = fields.Boolean(
+        string="Active",
+        default=True
+    )
+    
+    template_file = fields.Binary(
+        string="Word Template",
+        required=True,
+        attachment=True,
+        help="Word template (.docx) file used for mail merge"
+    )
+    
+    template_filename = fields.Char(
+        string="Template Filename"
+    )
+    
+    checksum = fields.Char(
+        string="Checksum",
+        compute='_compute_template_manifest',
+        store=True,
+        index=True,
+        help="SHA1 of the template content, used to store each template only once"
+    )
+    
+    variable_names = fields.Text(
+        string="Template Variables",
+        compute='_compute_template_manifest',
+        store=True,
+        help="Variables referenced by the template, one per line"
+    )
+    
+    template_error = fields.Char(
+        string="Template Error",
+        compute='_compute_template_manifest',
+        store=True
+    )
+    
+    _sql_constraints = [
+        ('checksum_unique', 'unique(checksum)', 'This template has already been uploaded.'),
+    ]
+    
+    @api.depends('template_file')
+    def _compute_template_manifest(self):
+        """Checksum the template and extract the variables it uses, once per upload"""
+        for record in self.with_context(bin_size=False):
+            if not record.template_file:
+                record.checksum = False
+                record.variable_names = False
+                record.template_error = False
+                continue
+            template_data = base64.b64decode(record.template_file)
+            record.checksum = hashlib.sha1(template_data).hexdigest()
+            try:
+                backend = export_backends.get_backend('template')
+                variables = backend.template_variables(template_data)
+                inline = backend.inline_variables(template_data, PARAGRAPH_VARIABLES & variables)
+            except Exception as e:
+                record.variable_names = False
+                record.template_error = str(e)
+                continue
+            record.variable_names = '\n'.join(sorted(variables))
+            # Paragraphs printed inside a paragraph make a corrupt document
+            record.template_error = (
+                f"{', '.join(sorted(inline))} must be placed alone in a paragraph, as "
+                + ", ".join(f"{{{{p {name}}}}}" for name in sorted(inline))
+            ) if inline else False
+    
+    @api.constrains('template_error', 'variable_names')
+    def _check_template(self):
+        for record in self:
+            if record.template_error:
+                raise ValidationError(f"Invalid Word template: {record.template_error}")
+            unknown = record._get_variables() - set(TEMPLATE_VARIABLES)
+            if unknown:
+                raise ValidationError(
+                    f"Unknown template variables: {', '.join(sorted(unknown))}. "
+                    f"Available variables: {', '.join(TEMPLATE_VARIABLES)}"
+                )
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Store each template file only once: uploading again the file of
+        an archived template restores it under the new values, uploading
+        the file of an active template under another name is refused"""
+        checksums = [
+            hashlib.sha1(base64.b64decode(vals['template_file'])).hexdigest() if vals.get('template_file') else None
+            for vals in vals_list
+        ]
+        existing = {
+            template.checksum: template
+            for template in self.with_context(active_test=False).search([
+                ('checksum', 'in', [checksum for checksum in checksums if checksum]),
+            ])
+        }
+        # Each vals is served by an existing template, or by the index of
+        # the vals creating it (the first of the batch with that file)
+        sources, to_create, first = [], [], {}
+        for vals, checksum in zip(vals_list, checksums):
+            source = existing.get(checksum, first.get(checksum))
+            if source is None:
+                if checksum:
+                    first[checksum] = len(to_create)
+                sources.append(len(to_create))
+                to_create.append(vals)
+                continue
+            if isinstance(source, int):
+                name = to_create[source].get('name')
+            elif not source.active:
+                source.write(dict(
+                    {key: value for key, value in vals.items() if key != 'template_file'}, active=True,
+                ))
+                name = vals.get('name', source.name)
+            else:
+                name = source.name
+            if vals.get('name', name) != name:
+                raise UserError(f"This file is already registered as the template {name}.")
+            sources.append(source)
+        
+        created = super().create(to_create)
+        return self.browse([
+            created[source].id if isinstance(source, int) else source.id for source in sources
+        ])
+    
+    def write(self, vals):
+        """Refuse uploading a file already stored as another template"""
+        if vals.get('template_file'):
+            checksum = hashlib.sha1(base64.b64decode(vals['template_file'])).hexdigest()
+            existing = self.with_context(active_test=False).search([
+                ('checksum', '=', checksum), ('id', 'not in', self.ids),
+            ], limit=1)
+            if existing:
+                raise UserError(f"This file is already registered as the template {existing.name}.")
+            if len(self) > 1:
+                raise UserError("The same file cannot be uploaded to several templates.")
+        return super().write(vals)
+    
+    def _get_variables(self):
+        """Set of variables referenced by the template"""
+        self.ensure_one()
+        return set((self.variable_names or '').split())
@@ -0,0 +1,79 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+from odoo.tools.sql import create_index, index_exists
+
+# Tombstones older than this many days are purged by default
+TOMBSTONE_RETENTION_DAYS = 90
+
+class ChangeRequestTombstone(models.Model):
+    _name = 'change.request.tombstone'
+    _description = 'Deleted Change Request Record'
+    _order = 'deleted_date, id'
+    _log_access = False
+    
+    res_model = fields.Selection([
+        ('simple.change.request', 'Change Request'),
+        ('change.request.effort.line', 'Effort Line')
+    ], string="Model", required=True)
+    
+    res_id = fields.Integer(
+        string="Record ID",
+        required=True
+    )
+    
+    change_request_id = fields.Integer(
+        string="Change Request ID",
+        help="Change request the deleted effort line belonged to"
+    )
+    
+    deleted_date = fields.Datetime(
+        string="Deleted On",
+        required=True,
+        default=fields.Datetime.now
+    )
+    
+    def init(self):
+        """Keyset index of the change feed"""
+        index_name = f'{self._table}_deleted_date_id_index'
+        if not index_exists(self.env.cr, index_name):
+            create_index(self.env.cr, index_name, self._table, ['deleted_date', 'id'])
+    
+    @api.model
+    def _record_deletions(self, model, ids):
+        """Leave a tombstone for the records of ``model`` about to be deleted,
+        and for the effort lines deleted along with change requests (their
+        ``ondelete='cascade'`` bypasses the ORM)"""
+        if not ids:
+            return
+        now = fields.Datetime.now()
+        if model == 'simple.change.request':
+            lines = SQL("line.change_request_id IN %s", tuple(ids))
+        else:
+            lines = SQL("line.id IN %s", tuple(ids))
+        self.env.cr.execute(SQL(
+            """INSERT INTO %s (res_model, res_id, change_request_id, deleted_date)
+               SELECT 'change.request.effort.line', line.id, line.change_request_id, %s
+                 FROM change_request_effort_line line
+                WHERE %s""",
+            SQL.identifier(self._table), now, lines,
+        ))
+        if model == 'simple.change.request':
+            self.env.cr.execute(SQL(
+                """INSERT INTO %s (res_model, res_id, change_request_id, deleted_date)
+                   SELECT 'simple.change.request', request.id, request.id, %s
+                     FROM simple_change_request request
+                    WHERE request.id IN %s""",
+                SQL.identifier(self._table), now, tuple(ids),
+            ))
+    
+    @api.autovacuum
+    def _gc_tombstones(self):
+        """Purge the tombstones past their retention period; change feed
+        cursors older than that must resynchronize from scratch"""
+        days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'simple_change_request.tombstone_retention_days', TOMBSTONE_RETENTION_DAYS
+        ))
+        self.env.cr.execute(SQL(
+            "DELETE FROM %s WHERE deleted_date < now() at time zone 'UTC' - make_interval(days => %s)",
+            SQL.identifier(self._table), days,
+        ))
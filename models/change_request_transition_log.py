@@ -0,0 +1,42 @@
+from odoo import models, fields
+
+from .simple_change_request import STATES
+
+class ChangeRequestTransitionLog(models.Model):
+    _name = 'change.request.transition.log'
+    _description = 'Change Request Status Transition'
+    _order = 'date desc, id desc'
+    _log_access = False
+    
+    change_request_id = fields.Many2one(
+        'simple.change.request',
+        string="Change Request",
+        required=True,
+        index=True,
+        ondelete='cascade'
+    )
+    
+    from_state = fields.Selection(
+        STATES,
+        string="From",
+        required=True
+    )
+    
+    to_state = fields.Selection(
+        STATES,
+        string="To",
+        required=True
+    )
+    
+    user_id = fields.Many2one(
+        'res.users',
+        string="User",
+        default=lambda self: self.env.uid,
+        required=True
+    )
+    
+    date = fields.Datetime(
+        string="Date",
+        default=fields.Datetime.now,
+        required=True
+    )
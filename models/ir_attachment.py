@@ -0,0 +1,12 @@
+from odoo import models, fields
+
+class IrAttachment(models.Model):
+    _inherit = 'ir.attachment'
+    
+    export_render_key = fields.Char(
+        string="Export Render Key",
+        index='btree_not_null',
+        copy=False,
+        readonly=True,
+        help="Content address of a generated change request export, used to reuse identical exports"
+    )
@@ -1,11 +1,119 @@
-from odoo import models, fields, api
-from odoo.exceptions import ValidationError
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+
+from odoo import models, fields, api, Command
+from odoo.exceptions import UserError, ValidationError
+from odoo.osv import expression
+from odoo.tools import SQL, html2plaintext, split_every
+from odoo.tools.sql import create_index, index_exists
+
+from ..tools import api_values, html_to_ooxml, ooxml_table
+
+STATES = [
+    ('draft', 'Draft'),
+    ('submitted', 'Submitted'),
+    ('approved', 'Approved'),
+    ('rejected', 'Rejected'),
+    ('completed', 'Completed')
+]
+
+# Workflow: target state -> states a change request may move from
+STATE_TRANSITIONS = {
+    'submitted': ('draft',),
+    'approved': ('submitted',),
+    'rejected': ('submitted',),
+    'completed': ('approved',),
+    'draft': ('submitted', 'approved', 'rejected'),
+}
+
+# Fields indexed by the full-text search document (name and change number first)
+SEARCH_DOCUMENT_FIELDS = [
+    'name', 'change_number', 'problem_statement', 'change_description', 'acceptance_criteria',
+    'reason_for_change', 'benefits_of_change', 'delivery_timeline', 'cost_estimation',
+    'assumptions', 'payment_milestones', 'justification',
+]
+
+# PostgreSQL text search configuration: language-neutral, no stemming
+SEARCH_TS_CONFIG = 'simple'
+
+# Fields feeding the rollup counters of change.request.project
+ROLLUP_FIELDS = {'project_id', 'state', 'expected_completion'}
+
+# Fields whose change records a revision (see change.request.revision)
+REVISION_TRIGGERS = {
+    'problem_statement', 'change_description', 'cost_estimation', 'payment_milestones', 'effort_breakdown_ids',
+}
+
+# Display name prefix of the most pressing priorities
+PRIORITY_MARKERS = {
+    'urgent': '🔴',
+    'high': '🟡',
+}
+
+# Template variables and the change request fields needed to compute them
+# (the effort breakdown lines are read separately, in one query per batch)
+TEMPLATE_VARIABLES = {
+    'project_name': ['project_id'],
+    'change_number': ['change_number'],
+    'change_request_date': ['change_request_date'],
+    'requester_name': ['requester_id'],
+    'department': ['department'],
+    'request_type': ['request_type'],
+    'priority': ['priority'],
+    'expected_completion': ['expected_completion'],
+    'problem_statement': ['problem_statement'],
+    'change_description': ['change_description_ooxml'],
+    'acceptance_criteria': ['acceptance_criteria'],
+    'reason_for_change': ['reason_for_change'],
+    'benefits_of_change': ['benefits_of_change'],
+    'delivery_timeline': ['delivery_timeline'],
+    'cost_estimation': ['cost_estimation'],
+    'assumptions': ['assumptions'],
+    'payment_milestones': ['payment_milestones'],
+    'total_effort_days': ['total_effort_days'],
+    'effort_breakdown': [],
+    'effort_table': [],
+}
+
+# Template variables built from the effort breakdown lines
+EFFORT_VARIABLES = {'effort_breakdown', 'effort_table'}
+
+# Template variables of the basic Word export: its effort breakdown is the
+# ready-made effort_table
+BASIC_EXPORT_VARIABLES = set(TEMPLATE_VARIABLES) - {'effort_breakdown'}
+
+# Template variables holding whole Word paragraphs (or tables): templates
+# must place them alone in a paragraph, with a {{p variable}} tag
+PARAGRAPH_VARIABLES = {'change_description', 'effort_table'}
+
+# Effort line fields exposed in the effort_breakdown template variable
+EFFORT_LINE_FIELDS = ['change_request_id', 'task_number', 'expected_task', 'effort_days', 'remarks', 'task_category']
+
+# Number of change requests whose template context is read at once
+TEMPLATE_CONTEXT_BATCH_SIZE = 1000
+
+# Change feed sources: cursor key, model and the date column it is read by
+FEED_SOURCES = [
+    ('change_requests', 'simple.change.request', 'write_date'),
+    ('effort_lines', 'change.request.effort.line', 'write_date'),
+    ('tombstones', 'change.request.tombstone', 'deleted_date'),
+]
+
+# Number of rows of one source read (and checkpointed) at once by the change feed
+FEED_BATCH_SIZE = 500
+
+# The change feed stops this many seconds in the past, and before the start
+# of the oldest transaction still running (see _get_feed_horizon)
+FEED_SETTLE_SECONDS = 60
 
 class SimpleChangeRequest(models.Model):
     _name = 'simple.change.request'
     _description = 'Simple Change Request'
     _order = 'sequence, create_date desc'
     _rec_name = 'name'
+    _rec_names_search = ['display_label', 'project_id.name']
     
     sequence = fields.Integer(string="Sequence", default=10)
     
@@ -23,20 +131,17 @@ class SimpleChangeRequest(models.Model):
         ('urgent', 'Urgent')
     ], string="Priority", default='medium', required=True)
     
-    state = fields.Selection([
-        ('draft', 'Draft'),
-        ('submitted', 'Submitted'),
-        ('approved', 'Approved'),
-        ('rejected', 'Rejected'),
-        ('completed', 'Completed')
-    ], string="Status", default='draft', required=True)
+    state = fields.Selection(
+        STATES, string="Status", default='draft', required=True, index=True
+    )
     
     # User and Department Information
     requester_id = fields.Many2one(
         'res.users', 
         string="Requester", 
         default=lambda self: self.env.user, 
-        required=True
+        required=True,
+        index=True
     )
     
     department = fields.Char(
@@ -63,22 +168,43 @@ class SimpleChangeRequest(models.Model):
     )
     
     # Change Request Document Fields
+    project_id = fields.Many2one(
+        'change.request.project',
+        string="Project",
+        index=True,
+        ondelete='restrict',
+        help="Project this change request belongs to"
+    )
+    
     project_name = fields.Char(
         string="Project Name",
-        help="Name of the project this change request belongs to"
+        compute='_compute_project_name',
+        inverse='_inverse_project_name',
+        search='_search_project_name',
+        help="Name of the project this change request belongs to; setting it picks (or creates) the project"
     )
     
     change_request_date = fields.Date(
         string="Change Request Date",
         default=fields.Date.today,
+        index=True,
         help="Date when this change request was created"
     )
     
     change_number = fields.Char(
         string="Change Number",
+        copy=False,
         help="Unique change request number"
     )
     
+    display_label = fields.Char(
+        string="Display Label",
+        compute='_compute_display_label',
+        store=True,
+        index='trigram',
+        help="Priority marker, change number and title, as shown in pickers"
+    )
+    
     problem_statement = fields.Text(
         string="Problem Statement",
         help="Describe the issue, gap, or opportunity that triggered this request"
@@ -89,6 +215,22 @@ class SimpleChangeRequest(models.Model):
         help="Describe the change being requested with detailed specifications"
     )
     
+    change_description_text = fields.Text(
+        string="Change Description (Plain Text)",
+        compute='_compute_change_description_rendering',
+        store=True,
+        prefetch=False,
+        help="Change description converted to plain text, keeping its paragraphs and lists"
+    )
+    
+    change_description_ooxml = fields.Text(
+        string="Change Description (Word)",
+        compute='_compute_change_description_rendering',
+        store=True,
+        prefetch=False,
+        help="Change description converted once to Word paragraphs, reused by every export"
+    )
+    
     acceptance_criteria = fields.Text(
         string="Acceptance Criteria",
         help="List the acceptance criteria for this change"
@@ -131,6 +273,18 @@ class SimpleChangeRequest(models.Model):
         string="Effort Breakdown"
     )
     
+    transition_log_ids = fields.One2many(
+        'change.request.transition.log',
+        'change_request_id',
+        string="Status History"
+    )
+    
+    revision_ids = fields.One2many(
+        'change.request.revision',
+        'change_request_id',
+        string="Revisions"
+    )
+    
     total_effort_days = fields.Float(
         string="Total Effort (Days)",
         compute='_compute_total_effort',
@@ -138,13 +292,35 @@ class SimpleChangeRequest(models.Model):
         help="Total effort in man-days"
     )
     
+    # Full-text Search
+    search_document = fields.Text(
+        string="Search Document",
+        compute='_compute_search_document',
+        store=True,
+        prefetch=False,
+        help="Plain-text concatenation of the narrative fields, indexed for full-text search"
+    )
+    
+    search_text = fields.Char(
+        string="Keywords",
+        compute='_compute_search_text',
+        search='_search_search_text'
+    )
+    
     # System Fields
     create_date = fields.Datetime(string="Created On", readonly=True)
     write_date = fields.Datetime(string="Last Modified", readonly=True)
     
     # Constraints
+    _sql_constraints = [
+        ('change_number_unique', 'unique(change_number)', 'The change number must be unique.'),
+    ]
+    
     @api.constrains('expected_completion')
     def _check_completion_date(self):
+        # Change requests restored from the archive keep their past dates
+        if self.env.context.get('restoring_archive'):
+            return
         for record in self:
             if record.expected_completion and record.expected_completion < fields.Date.today():
                 raise ValidationError("Expected completion date cannot be in the past.")
@@ -156,83 +332,493 @@ class SimpleChangeRequest(models.Model):
                 raise ValidationError("Request title must be at least 5 characters long.")
     
     # Computed Fields
+    @api.depends('name', 'priority', 'change_number')
+    def _compute_display_label(self):
+        for record in self:
+            parts = [
+                PRIORITY_MARKERS.get(record.priority),
+                f"[{record.change_number}]" if record.change_number else None,
+                record.name,
+            ]
+            record.display_label = ' '.join(part for part in parts if part)
+    
+    @api.depends('display_label')
+    def _compute_display_name(self):
+        for record in self:
+            record.display_name = record.display_label or record.name
+    
+    @api.depends('project_id.name')
+    def _compute_project_name(self):
+        for record in self:
+            record.project_name = record.project_id.name
+    
+    def _inverse_project_name(self):
+        projects = self.env['change.request.project']._get_or_create_by_name(set(self.mapped('project_name')))
+        for record in self:
+            record.project_id = projects.get(record.project_name, False)
+    
+    def _search_project_name(self, operator, value):
+        return [('project_id.name', operator, value)]
+    
     @api.depends('effort_breakdown_ids.effort_days')
     def _compute_total_effort(self):
         for record in self:
             record.total_effort_days = sum(record.effort_breakdown_ids.mapped('effort_days'))
     
-    # Model Methods
+    @api.depends('change_description')
+    def _compute_change_description_rendering(self):
+        for record in self:
+            ooxml, text = html_to_ooxml.convert(record.change_description)
+            record.change_description_ooxml = ooxml
+            record.change_description_text = text
+    
+    @api.depends(*SEARCH_DOCUMENT_FIELDS)
+    def _compute_search_document(self):
+        for record in self:
+            parts = [record.name, record.change_number]
+            for fname in SEARCH_DOCUMENT_FIELDS[2:]:
+                value = record[fname]
+                if value and record._fields[fname].type == 'html':
+                    value = html2plaintext(value)
+                parts.append(value)
+            record.search_document = '\n'.join(part for part in parts if part)
+    
+    def _compute_search_text(self):
+        self.search_text = False
+    
+    def _search_search_text(self, operator, value):
+        """Match the keywords against the full-text index of the search document"""
+        if operator not in ('ilike', '=', 'like') or not isinstance(value, str):
+            raise UserError("Keyword search only supports text matching.")
+        query = self._search([])
+        query.add_where(self._fulltext_condition(value))
+        return [('id', 'in', query)]
+    
     @api.model
-    def create(self, vals):
-        """Override create to generate sequence number"""
-        if not vals.get('name') or vals.get('name') == 'New':
-            sequence = self.env['ir.sequence'].next_by_code('simple.change.request')
-            if sequence:
-                vals['name'] = sequence
-            else:
-                # Fallback sequence generation
-                count = self.env['simple.change.request'].search_count([])
-                vals['name'] = 'CR-' + str(count + 1).zfill(4)
+    def _fulltext_condition(self, text):
+        """SQL condition matching the search document against ``text``, using the GIN index"""
+        return SQL(
+            "to_tsvector(%s, COALESCE(%s, '')) @@ websearch_to_tsquery(%s, %s)",
+            SEARCH_TS_CONFIG, SQL.identifier(self._table, 'search_document'), SEARCH_TS_CONFIG, text,
+        )
+    
+    @api.model
+    def _search_fulltext(self, text, domain=None, limit=None, exclude_ids=()):
+        """Records matching ``text`` in their narrative fields, best ranked first"""
+        query = self._search(domain or [])
+        query.add_where(self._fulltext_condition(text))
+        if exclude_ids:
+            query.add_where(SQL("%s NOT IN %s", SQL.identifier(self._table, 'id'), tuple(exclude_ids)))
+        query.order = SQL(
+            "ts_rank(to_tsvector(%s, COALESCE(%s, '')), websearch_to_tsquery(%s, %s)) DESC, %s DESC",
+            SEARCH_TS_CONFIG, SQL.identifier(self._table, 'search_document'), SEARCH_TS_CONFIG, text,
+            SQL.identifier(self._table, 'id'),
+        )
+        query.limit = limit
+        return self.browse(query)
+    
+    @api.model
+    def _name_search(self, name, domain=None, operator='ilike', limit=None, order=None):
+        """Match change numbers, titles and project names through their indexes.
         
-        # Generate change number if not provided
-        if not vals.get('change_number'):
-            vals['change_number'] = vals.get('name', 'CR-0001')
+        An exact change number is looked up first (unique index), then the
+        display labels, holding numbers and titles, and the project names
+        (trigram indexes). Each step only asks for the records still missing
+        to reach ``limit``, most recent first, so that PostgreSQL can stop as
+        soon as it has found them.
+        """
+        if not name or operator != 'ilike':
+            return super()._name_search(name, domain, operator, limit, order)
+        domain = domain or []
+        steps = [
+            [('change_number', '=', name.strip().upper())],
+            [('display_label', 'ilike', name)],
+            [('project_id', 'in', self.env['change.request.project']._search([('name', 'ilike', name)]))],
+        ]
+        ids = []
+        for step in steps:
+            if limit and len(ids) >= limit:
+                break
+            step_domain = expression.AND([domain, step, [('id', 'not in', ids)] if ids else []])
+            ids += self._search(step_domain, limit=limit and limit - len(ids), order='id desc')
+        return ids
+    
+    @api.model
+    def name_search(self, name='', domain=None, operator='ilike', limit=100):
+        """Complete the title matches with ranked full-text matches"""
+        results = super().name_search(name, domain, operator, limit)
+        if not name or operator != 'ilike' or (limit and len(results) >= limit):
+            return results
+        matches = self._search_fulltext(
+            name, domain, limit and limit - len(results), exclude_ids=[record_id for record_id, _name in results],
+        )
+        return results + [(record.id, record.display_name) for record in matches]
+    
+    def init(self):
+        """Full-text index of the search documents, keyset index of the read API"""
+        index_name = f'{self._table}_search_document_fts_index'
+        if not index_exists(self.env.cr, index_name):
+            create_index(
+                self.env.cr,
+                index_name,
+                self._table,
+                [f"to_tsvector('{SEARCH_TS_CONFIG}', COALESCE(search_document, ''))"],
+                method='gin',
+            )
+        index_name = f'{self._table}_write_date_id_index'
+        if not index_exists(self.env.cr, index_name):
+            create_index(self.env.cr, index_name, self._table, ['write_date', 'id'])
+    
+    # Model Methods
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Override create to generate sequence numbers, reserved in one block for the whole batch"""
+        unnumbered = [
+            vals for vals in vals_list
+            if not vals.get('name') or vals.get('name') == 'New' or not vals.get('change_number')
+        ]
+        numbers = iter(self._reserve_change_numbers(len(unnumbered)))
+        for vals in unnumbered:
+            number = next(numbers)
+            if not vals.get('name') or vals.get('name') == 'New':
+                vals['name'] = number
+            # Generate change number if not provided
+            if not vals.get('change_number'):
+                vals['change_number'] = number
         
-        return super(SimpleChangeRequest, self).create(vals)
+        # A new change request has no history: its lines are no revision
+        records = super(SimpleChangeRequest, self.with_context(skip_revisions=True)).create(vals_list)
+        records.project_id._refresh_rollups()
+        return records.with_env(self.env)
+    
+    def write(self, vals):
+        """Keep the rollup counters of the affected projects up to date, and
+        the revision history of the narratives and effort breakdown"""
+        if self.env.context.get('skip_revisions') or not REVISION_TRIGGERS.intersection(vals):
+            return self._write_rollups(vals)
+        # One revision for the whole write, effort line commands included
+        Revision = self.env['change.request.revision']
+        before = Revision._take_snapshots(self)
+        res = self.with_context(skip_revisions=True)._write_rollups(vals)
+        Revision._record_revisions(self, before)
+        return res
+    
+    def _write_rollups(self, vals):
+        if not ROLLUP_FIELDS.intersection(vals):
+            return super().write(vals)
+        projects = self.project_id
+        res = super().write(vals)
+        (projects | self.project_id)._refresh_rollups()
+        return res
+    
+    def unlink(self):
+        """Keep the rollup counters of the affected projects up to date and leave tombstones for the change feed"""
+        self.env['change.request.tombstone']._record_deletions(self._name, self.ids)
+        projects = self.project_id
+        res = super().unlink()
+        projects._refresh_rollups()
+        return res
+    
+    @api.model
+    def _reserve_change_numbers(self, count):
+        """Reserve ``count`` unique CR- numbers at once"""
+        if not count:
+            return []
+        sequence = self._get_change_number_sequence()
+        if not sequence:
+            sequence = self._create_change_number_sequence()
+        return sequence._next_block(count)
+    
+    @api.model
+    def _get_change_number_sequence(self):
+        return self.env['ir.sequence'].sudo().search([
+            ('code', '=', self._name),
+            ('company_id', 'in', [self.env.company.id, False]),
+        ], order='company_id', limit=1)
+    
+    @api.model
+    def _create_change_number_sequence(self):
+        """Recreate the missing CR- sequence, continuing after the highest existing number"""
+        # Serialize concurrent workers so that only one of them creates it
+        self.env.cr.execute(SQL("SELECT pg_advisory_xact_lock(hashtext(%s))", self._name))
+        sequence = self._get_change_number_sequence()
+        if sequence:
+            return sequence
+        self.flush_model(['change_number'])
+        self.env.cr.execute(SQL(
+            "SELECT MAX(substring(change_number FROM '^CR-([0-9]+)$')::integer) FROM %s",
+            SQL.identifier(self._table),
+        ))
+        last_number = self.env.cr.fetchone()[0] or 0
+        return self.env['ir.sequence'].sudo().create({
+            'name': 'Simple Change Request Sequence',
+            'code': self._name,
+            'prefix': 'CR-',
+            'padding': 4,
+            'number_next': last_number + 1,
+            'number_increment': 1,
+            'company_id': False,
+        })
     
     # Action Methods
     def action_submit(self):
         """Submit the change request for approval"""
-        for record in self:
-            record.state = 'submitted'
-        return True
+        return self.transition('submitted')
     
     def action_approve(self):
         """Approve the change request"""
-        for record in self:
-            record.state = 'approved'
-        return True
+        return self.transition('approved')
     
     def action_reject(self):
         """Reject the change request"""
-        for record in self:
-            record.state = 'rejected'
-        return True
+        return self.transition('rejected')
     
     def action_complete(self):
         """Mark the change request as completed"""
-        for record in self:
-            record.state = 'completed'
-        return True
+        return self.transition('completed')
     
     def action_reset_to_draft(self):
         """Reset the change request to draft state"""
-        for record in self:
-            record.state = 'draft'
+        return self.transition('draft')
+    
+    # Workflow
+    def transition(self, target):
+        """Move every record to the ``target`` state.
+        
+        All records must be in one of the source states allowed for the target
+        by STATE_TRANSITIONS (records already in the target state are left
+        alone). They are updated with a single write and the moves are
+        appended to the transition log in one batch.
+        """
+        if target not in STATE_TRANSITIONS:
+            raise UserError(f"Unknown change request state: {target}")
+        
+        self.fetch(['name', 'state'])
+        todo = self.filtered(lambda record: record.state != target)
+        illegal = todo.filtered(lambda record: record.state not in STATE_TRANSITIONS[target])
+        if illegal:
+            states = dict(self._fields['state'].selection)
+            raise UserError(
+                f"Cannot move to {states[target]}: "
+                + ", ".join(f"{record.name} ({states[record.state]})" for record in illegal[:10])
+                + (f" and {len(illegal) - 10} more" if len(illegal) > 10 else "")
+            )
+        if not todo:
+            return True
+        
+        log_values = [{
+            'change_request_id': record.id,
+            'from_state': record.state,
+            'to_state': target,
+        } for record in todo]
+        todo.write({'state': target})
+        self.env['change.request.transition.log'].sudo().create(log_values)
         return True
     
     # Export Methods
     def export_to_word(self):
         """Export change request to Word document using mail merge"""
-        # This will be implemented with a Word template
+        if len(self) > 1:
+            # Several requests selected: export them all at once into a ZIP
+            context = {
+                'default_export_mode': 'batch',
+                'default_change_request_ids': [Command.set(self.ids)],
+            }
+        else:
+            context = {'default_change_request_id': self.id}
         return {
             'type': 'ir.actions.act_window',
             'name': 'Export to Word',
             'res_model': 'change.request.export.wizard',
             'view_mode': 'form',
             'target': 'new',
-            'context': {'default_change_request_id': self.id}
+            'context': context
         }
     
-    # Utility Methods
-    def name_get(self):
-        """Custom name display"""
-        result = []
-        for record in self:
-            name = record.name
-            if record.priority == 'urgent':
-                name = f"🔴 {name}"
-            elif record.priority == 'high':
-                name = f"🟡 {name}"
-            result.append((record.id, name))
-        return result
+    def _iter_template_contexts(self, variables=None, include_effort_breakdown=True):
+        """Lazily yield ``(record, context)`` for Word template rendering.
+        
+        The records are processed in batches; each batch reads the change
+        requests, their requesters and all their effort lines in a constant
+        number of queries, whatever the number of records and lines. When
+        ``variables`` is given, only those template variables are computed.
+        """
+        variables = set(TEMPLATE_VARIABLES) if variables is None else set(variables) & set(TEMPLATE_VARIABLES)
+        if not include_effort_breakdown:
+            variables -= EFFORT_VARIABLES
+        fnames = list({fname for variable in variables for fname in TEMPLATE_VARIABLES[variable]})
+        
+        # Selection labels are computed once for the whole recordset
+        request_types = dict(self._fields['request_type'].selection)
+        priorities = dict(self._fields['priority'].selection)
+        task_categories = dict(self.env['change.request.effort.line']._fields['task_category'].selection)
+        
+        getters = {
+            'project_name': lambda cr: cr.project_id.name or '',
+            'change_number': lambda cr: cr.change_number or '',
+            'change_request_date': lambda cr: str(cr.change_request_date) if cr.change_request_date else '',
+            'requester_name': lambda cr: cr.requester_id.name if cr.requester_id else '',
+            'department': lambda cr: cr.department or '',
+            'request_type': lambda cr: request_types.get(cr.request_type, ''),
+            'priority': lambda cr: priorities.get(cr.priority, ''),
+            'expected_completion': lambda cr: str(cr.expected_completion) if cr.expected_completion else '',
+            'problem_statement': lambda cr: cr.problem_statement or '',
+            'change_description': lambda cr: (
+                html_to_ooxml.rich_text(cr.change_description_ooxml) if cr.change_description_ooxml else ''
+            ),
+            'acceptance_criteria': lambda cr: cr.acceptance_criteria or '',
+            'reason_for_change': lambda cr: cr.reason_for_change or '',
+            'benefits_of_change': lambda cr: cr.benefits_of_change or '',
+            'delivery_timeline': lambda cr: cr.delivery_timeline or '',
+            'cost_estimation': lambda cr: cr.cost_estimation or '',
+            'assumptions': lambda cr: cr.assumptions or '',
+            'payment_milestones': lambda cr: cr.payment_milestones or '',
+            'total_effort_days': lambda cr: cr.total_effort_days or 0,
+        }
+        
+        for ids in split_every(TEMPLATE_CONTEXT_BATCH_SIZE, self.ids):
+            batch = self.browse(ids)
+            batch.fetch(fnames)
+            if 'project_name' in variables:
+                batch.project_id.fetch(['name'])
+            if 'requester_name' in variables:
+                batch.requester_id.partner_id.fetch(['name'])
+            
+            # Effort breakdown table
+            lines_by_request = {}
+            if variables & EFFORT_VARIABLES:
+                lines = self.env['change.request.effort.line'].search_fetch(
+                    [('change_request_id', 'in', ids)], EFFORT_LINE_FIELDS,
+                )
+                for line in lines:
+                    lines_by_request.setdefault(line.change_request_id.id, []).append({
+                        'task_number': line.task_number or '',
+                        'expected_task': line.expected_task or '',
+                        'effort_days': line.effort_days or 0,
+                        'remarks': line.remarks or '',
+                        'task_category': task_categories.get(line.task_category, ''),
+                    })
+            
+            for record in batch:
+                context = {
+                    variable: getters[variable](record)
+                    for variable in variables if variable not in EFFORT_VARIABLES
+                }
+                if lines_by_request.get(record.id):
+                    if 'effort_breakdown' in variables:
+                        context['effort_breakdown'] = lines_by_request[record.id]
+                    if 'effort_table' in variables:
+                        # Whole table as Word XML, for templates with thousands of lines
+                        context['effort_table'] = html_to_ooxml.rich_text(
+                            ooxml_table.effort_table_xml(lines_by_request[record.id])
+                        )
+                yield record, context
+    
+    # Change Feed
+    @api.model
+    def _encode_feed_cursor(self, positions):
+        payload = json.dumps({key: [date.isoformat(), record_id] for key, (date, record_id) in positions.items()})
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+    
+    @api.model
+    def _decode_feed_cursor(self, cursor):
+        """Positions ``{source: (date, id)}`` of a change feed cursor"""
+        if not cursor:
+            return {}
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return {
+                key: (datetime.fromisoformat(payload[key][0]), int(payload[key][1]))
+                for key, _model, _column in FEED_SOURCES if key in payload
+            }
+        except (ValueError, TypeError, KeyError, IndexError, AttributeError, binascii.Error):
+            raise UserError("Invalid change feed cursor.")
+    
+    @api.model
+    def _get_feed_horizon(self):
+        """Date before which every change is committed, for the change feed
+        and the read API to never move their cursor past a change that may
+        still show up.
+        
+        Records are stamped with the start time of their transaction: a
+        transaction running for longer than FEED_SETTLE_SECONDS (a bulk
+        import, an archival batch) commits rows dated before any fixed
+        delay. The horizon therefore also stops at the start of the oldest
+        transaction still running on the database, so long transactions
+        delay the feed instead of losing their changes.
+        """
+        self.env.cr.execute("""
+            SELECT MIN(xact_start) AT TIME ZONE 'UTC'
+              FROM pg_stat_activity
+             WHERE datname = current_database()
+               AND pid != pg_backend_pid()
+               AND xact_start IS NOT NULL
+        """)
+        oldest = self.env.cr.fetchone()[0]
+        horizon = self.env.cr.now() - timedelta(seconds=FEED_SETTLE_SECONDS)
+        return min(horizon, oldest) if oldest else horizon
+    
+    @api.model
+    def _iter_change_feed(self, cursor=None, batch_size=FEED_BATCH_SIZE):
+        """Lazily yield the change feed events since ``cursor``.
+        
+        Change requests and effort lines created or modified since the cursor
+        come as ``upsert`` events with their values, deleted ones as
+        ``delete`` events (from their tombstones). Each source is read in
+        ``(date, id)`` keyset order through its index, one batch at a time,
+        and every batch is followed by a ``checkpoint`` event carrying the
+        cursor to resume from.
+        """
+        positions = self._decode_feed_cursor(cursor)
+        checkpointed = False
+        horizon = self._get_feed_horizon()
+        fnames_by_model = {
+            'simple.change.request': api_values.CHANGE_REQUEST_FIELDS,
+            'change.request.effort.line': api_values.EFFORT_LINE_FIELDS,
+        }
+        for key, model, column in FEED_SOURCES:
+            Model = self.env[model]
+            date_column = SQL.identifier(Model._table, column)
+            id_column = SQL.identifier(Model._table, 'id')
+            while True:
+                query = Model._search([(column, '<', horizon)])
+                if key in positions:
+                    query.add_where(SQL("(%s, %s) > (%s, %s)", date_column, id_column, *positions[key]))
+                query.order = SQL("%s, %s", date_column, id_column)
+                query.limit = batch_size
+                rows = self.env.execute_query(query.select(id_column, date_column))
+                if not rows:
+                    break
+                
+                records = Model.browse([row[0] for row in rows])
+                if model == 'change.request.tombstone':
+                    records.fetch(['res_model', 'res_id', 'change_request_id', 'deleted_date'])
+                    for tombstone in records:
+                        yield {
+                            'op': 'delete',
+                            'model': tombstone.res_model,
+                            'id': tombstone.res_id,
+                            'change_request_id': tombstone.change_request_id,
+                            'deleted_date': tombstone.deleted_date.isoformat(),
+                        }
+                else:
+                    records.fetch(fnames_by_model[model])
+                    for record in records:
+                        yield {
+                            'op': 'upsert',
+                            'model': model,
+                            'id': record.id,
+                            'values': api_values.serialize_record(record, fnames_by_model[model]),
+                        }
+                
+                positions[key] = (rows[-1][1], rows[-1][0])
+                yield {'op': 'checkpoint', 'cursor': self._encode_feed_cursor(positions)}
+                checkpointed = True
+                # Only the current batch is ever kept in the cache
+                self.env.invalidate_all()
+                if len(rows) < batch_size:
+                    break
+        
+        # Nothing new: hand the cursor back unchanged
+        if not checkpointed:
+            yield {'op': 'checkpoint', 'cursor': self._encode_feed_cursor(positions)}
@@ -0,0 +1,4 @@
+from . import test_archive
+from . import test_effort_import
+from . import test_ooxml_table
+from . import test_performance
@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+
+from odoo import Command
+from odoo.tests import TransactionCase, new_test_user, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestChangeRequestArchive(TransactionCase):
+    """Archiving a change request closed through the workflow, then
+    restoring it as a regular user, gives it back whole."""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.requester = new_test_user(cls.env, login='archive_requester', groups='base.group_user')
+        cls.restorer = new_test_user(cls.env, login='archive_restorer', groups='base.group_user')
+        cls.project = cls.env['change.request.project'].create({'name': 'Archive Project'})
+    
+    def _make_closed_request(self):
+        ChangeRequest = self.env['simple.change.request'].with_user(self.requester)
+        change_request = ChangeRequest.create({
+            'name': "Archived change request",
+            'project_id': self.project.id,
+            'department': 'IT Department',
+            'request_type': 'system',
+            'priority': 'high',
+            'expected_completion': date.today() + timedelta(days=30),
+            'problem_statement': "The current process is slow.",
+            'change_description': "<p>Make it <b>fast</b>.</p>",
+            'effort_breakdown_ids': [
+                Command.create({'task_number': '1', 'expected_task': "Analysis", 'effort_days': 2.0}),
+                Command.create({'task_number': '2', 'expected_task': "Development", 'effort_days': 5.5}),
+            ],
+        })
+        # Revisions of the narrative and of the effort breakdown
+        change_request.problem_statement = "The current process is far too slow."
+        change_request.effort_breakdown_ids[0].effort_days = 3.0
+        change_request.action_submit()
+        change_request.action_approve()
+        change_request.action_complete()
+        self.env['ir.attachment'].create({
+            'name': 'Change_Request.docx',
+            'raw': b'exported document',
+            'res_model': 'simple.change.request',
+            'res_id': change_request.id,
+        })
+        self.env.flush_all()
+        return change_request
+    
+    def test_archive_restore_round_trip(self):
+        change_request = self._make_closed_request()
+        request_fnames = ['name', 'change_number', 'state', 'project_id', 'problem_statement']
+        values = change_request.read(request_fnames)[0]
+        lines = change_request.effort_breakdown_ids.read(['task_number', 'expected_task', 'effort_days'], load=None)
+        logs = change_request.transition_log_ids.sorted('id').read(['date', 'from_state', 'to_state'], load=None)
+        revisions = change_request.revision_ids.sorted('revision_number').read(
+            ['revision_number', 'date', 'keyframe', 'changed_fields'], load=None,
+        )
+        versions = [revision._get_version(change_request, revision.revision_number)
+                    for revision in change_request.revision_ids]
+        self.assertEqual(len(logs), 3)
+        self.assertTrue(revisions)
+        
+        archive = self.env['change.request.archive']._archive_change_requests(change_request)
+        self.assertFalse(change_request.exists())
+        self.assertEqual(archive.effort_line_count, 2)
+        self.assertEqual(archive.export_count, 1)
+        # The requester leaves before the change request is restored
+        self.requester.unlink()
+        
+        restored = archive.with_user(self.restorer)._restore()
+        self.assertFalse(archive.exists())
+        self.assertEqual(restored.read(request_fnames)[0], dict(values, id=restored.id))
+        self.assertEqual(restored.requester_id, self.restorer)
+        self.assertEqual(
+            restored.effort_breakdown_ids.read(['task_number', 'expected_task', 'effort_days'], load=None),
+            [dict(line, id=new_line.id) for line, new_line in zip(lines, restored.effort_breakdown_ids)],
+        )
+        restored_logs = restored.transition_log_ids.sorted('id')
+        self.assertEqual(
+            restored_logs.read(['date', 'from_state', 'to_state'], load=None),
+            [dict(log, id=new_log.id) for log, new_log in zip(logs, restored_logs)],
+        )
+        self.assertEqual(restored_logs.user_id, self.restorer)
+        restored_revisions = restored.revision_ids.sorted('revision_number')
+        self.assertEqual(
+            restored_revisions.read(['revision_number', 'date', 'keyframe', 'changed_fields'], load=None),
+            [dict(revision, id=new_revision.id) for revision, new_revision in zip(revisions, restored_revisions)],
+        )
+        self.assertEqual(
+            [revision._get_version(restored, revision.revision_number) for revision in restored.revision_ids],
+            versions,
+        )
+        attachment = self.env['ir.attachment'].search([
+            ('res_model', '=', 'simple.change.request'), ('res_id', '=', restored.id),
+        ])
+        self.assertEqual(attachment.raw, b'exported document')
@@ -0,0 +1,38 @@
+from datetime import date, datetime, timedelta
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestEffortImport(TransactionCase):
+    """Bulk imports of effort lines refresh the totals of their change
+    requests like ORM writes would."""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.change_request = cls.env['simple.change.request'].create({
+            'name': "Imported change request",
+            'department': 'IT Department',
+            'request_type': 'system',
+            'priority': 'medium',
+            'expected_completion': date.today() + timedelta(days=30),
+        })
+    
+    def test_import_stamps_change_request(self):
+        # Pretend the change request was last modified long ago
+        self.env.flush_all()
+        old_date = datetime(2020, 1, 1)
+        self.env.cr.execute(
+            "UPDATE simple_change_request SET write_date = %s, write_uid = NULL WHERE id = %s",
+            (old_date, self.change_request.id),
+        )
+        self.change_request.invalidate_recordset()
+        
+        self.env['change.request.effort.line']._bulk_import([
+            {'expected_task': "Analysis", 'effort_days': 2},
+            {'expected_task': "Development", 'effort_days': '3.5'},
+        ], self.change_request)
+        self.assertEqual(self.change_request.total_effort_days, 5.5)
+        self.assertGreater(self.change_request.write_date, old_date)
+        self.assertEqual(self.change_request.write_uid, self.env.user)
@@ -0,0 +1,29 @@
+from lxml import etree
+
+from odoo.tests import BaseCase, tagged
+
+from ..tools import ooxml_table
+
+W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+
+@tagged('post_install', '-at_install')
+class TestEffortTable(BaseCase):
+    """Effort breakdown tables written straight to WordprocessingML"""
+    
+    def _parse(self, xml):
+        return etree.fromstring(f'<w:body xmlns:w="{W}">{xml}</w:body>')
+    
+    def test_multi_line_cells(self):
+        table = self._parse(ooxml_table.effort_table_xml([{
+            'task_number': '1',
+            'expected_task': "Analysis",
+            'effort_days': 2.0,
+            'remarks': "First line\nSecond line & more\r\nThird line",
+        }]))
+        remarks = table.findall(f'.//{{{W}}}tr')[1].findall(f'{{{W}}}tc')[3]
+        run = remarks.find(f'.//{{{W}}}r')
+        self.assertEqual(
+            [(etree.QName(child).localname, child.text) for child in run],
+            [('t', "First line"), ('br', None), ('t', "Second line & more"), ('br', None), ('t', "Third line")],
+        )
@@ -0,0 +1,267 @@
+import base64
+import importlib.util
+import math
+import os
+import time
+from datetime import date, timedelta
+from io import BytesIO
+
+from odoo import Command
+from odoo.models import PREFETCH_MAX
+from odoo.tests import TransactionCase, tagged
+
+# Numbers of records (or effort lines) every entry point is measured with
+SIZES = [1, 100, 10000]
+
+# Batch Word exports render one document per record: measured on fewer
+EXPORT_SIZES = [1, 10, 100]
+
+# Extra queries tolerated over the smallest size, and per additional
+# prefetch batch of records (the ORM reads PREFETCH_MAX records at once)
+QUERY_SLACK = 5
+QUERY_SLACK_PER_BATCH = 5
+
+# Wall-time budget of each entry point: fixed seconds plus milliseconds per
+# record; scaled by CHANGE_REQUEST_PERF_BUDGET_FACTOR on slow machines
+TIME_BUDGETS = {
+    'create': (1.0, 5.0),
+    'form load': (0.5, 0.5),
+    'list read': (0.5, 0.5),
+    'kanban read_group': (0.5, 0.05),
+    'display_name': (0.5, 0.1),
+    'action_submit': (0.5, 2.0),
+    'action_reject': (0.5, 2.0),
+    'action_reset_to_draft': (0.5, 2.0),
+    'action_approve': (0.5, 2.0),
+    'action_complete': (0.5, 2.0),
+    '_iter_template_contexts (records)': (0.5, 1.0),
+    '_iter_template_contexts (lines)': (0.5, 0.2),
+    '_prepare_template_context': (0.5, 0.2),
+    'basic Word export': (2.0, 0.5),
+    'template Word export': (2.0, 2.0),
+    'batch Word export': (2.0, 100.0),
+}
+
+LIST_SPEC = {
+    'name': {}, 'change_number': {}, 'department': {}, 'priority': {}, 'request_type': {},
+    'total_effort_days': {}, 'expected_completion': {}, 'state': {},
+    'project_id': {'fields': {'display_name': {}}},
+    'requester_id': {'fields': {'display_name': {}}},
+}
+
+FORM_SPEC = dict(LIST_SPEC, **{
+    'problem_statement': {}, 'change_description': {}, 'acceptance_criteria': {}, 'reason_for_change': {},
+    'benefits_of_change': {}, 'delivery_timeline': {}, 'cost_estimation': {}, 'assumptions': {},
+    'payment_milestones': {}, 'change_request_date': {}, 'justification': {},
+    'effort_breakdown_ids': {'fields': {
+        'task_number': {}, 'expected_task': {}, 'effort_days': {}, 'remarks': {}, 'task_category': {},
+    }},
+    'transition_log_ids': {'fields': {'date': {}, 'user_id': {'fields': {'display_name': {}}},
+                                      'from_state': {}, 'to_state': {}}},
+    'revision_ids': {'fields': {'revision_number': {}, 'date': {}, 'changed_fields': {}}},
+})
+
+HAS_DOCX = bool(importlib.util.find_spec('docx'))
+HAS_DOCXTPL = bool(importlib.util.find_spec('docxtpl'))
+
+
+@tagged('post_install', '-at_install', 'change_request_performance')
+class TestPerformanceBudgets(TransactionCase):
+    """Query counts and wall time of the hot entry points, at 1, 100 and
+    10,000 records: a query per record (or per line) fails the suite."""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.project = cls.env['change.request.project'].create({'name': 'Performance Project'})
+        cls.budget_factor = float(os.environ.get('CHANGE_REQUEST_PERF_BUDGET_FACTOR', 1))
+        
+        # Disjoint slices of draft change requests, one per size
+        records = cls.env['simple.change.request'].create(cls._request_values(sum(SIZES)))
+        cls.slices, start = {}, 0
+        for size in SIZES:
+            cls.slices[size] = records[start:start + size]
+            start += size
+        
+        # One change request per size with that many effort lines
+        cls.lined = {
+            size: cls.env['simple.change.request'].create(dict(cls._request_values(1)[0], effort_breakdown_ids=[
+                Command.create({
+                    'task_number': str(line + 1),
+                    'expected_task': f"Task {line + 1}",
+                    'effort_days': 1.5,
+                    'task_category': 'development',
+                }) for line in range(size)
+            ]))
+            for size in SIZES
+        }
+        cls.env['ir.config_parameter'].sudo().set_param('simple_change_request.export_max_workers', 1)
+        cls.env.flush_all()
+    
+    @classmethod
+    def _request_values(cls, count):
+        expected_completion = date.today() + timedelta(days=30)
+        return [{
+            'name': f"Performance change request {index:05d}",
+            'project_id': cls.project.id,
+            'department': 'IT Department',
+            'request_type': 'system',
+            'priority': 'medium',
+            'expected_completion': expected_completion,
+            'problem_statement': "The current process is slow.",
+            'change_description': "<p>Make it <b>fast</b>.</p><ul><li>Batch</li><li>Prefetch</li></ul>",
+            'cost_estimation': "Total: $10,000",
+        } for index in range(count)]
+    
+    def _measure(self, function):
+        """Run ``function`` on a cold cache; return its query count and duration"""
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries = self.env.cr.sql_log_count
+        start = time.perf_counter()
+        function()
+        self.env.flush_all()
+        return self.env.cr.sql_log_count - queries, time.perf_counter() - start
+    
+    def assertWithinBudgets(self, name, measures):
+        """``measures`` maps each size to its ``(queries, seconds)``"""
+        smallest = min(measures)
+        base_queries = measures[smallest][0]
+        fixed, per_record_ms = TIME_BUDGETS[name]
+        for size, (queries, seconds) in sorted(measures.items()):
+            query_budget = (
+                base_queries + QUERY_SLACK
+                + QUERY_SLACK_PER_BATCH * (math.ceil(size / PREFETCH_MAX) - 1)
+            )
+            self.assertLessEqual(
+                queries, query_budget,
+                f"{name}: {queries} queries for {size} records, {base_queries} for {smallest}: "
+                f"the query count grows with the number of records",
+            )
+            time_budget = (fixed + per_record_ms * size / 1000) * self.budget_factor
+            self.assertLessEqual(
+                seconds, time_budget,
+                f"{name}: {seconds:.3f}s for {size} records, over its {time_budget:.3f}s budget",
+            )
+    
+    # Create and reads
+    def test_create(self):
+        Request = self.env['simple.change.request']
+        self.assertWithinBudgets('create', {
+            size: self._measure(lambda: Request.create(self._request_values(size))) for size in SIZES
+        })
+    
+    def test_form_load(self):
+        self.assertWithinBudgets('form load', {
+            size: self._measure(lambda: self.lined[size].web_read(FORM_SPEC)) for size in SIZES
+        })
+    
+    def test_list_read(self):
+        Request = self.env['simple.change.request']
+        self.assertWithinBudgets('list read', {
+            size: self._measure(lambda: Request.web_search_read(
+                [('id', 'in', self.slices[size].ids)], LIST_SPEC, limit=size,
+            ))
+            for size in SIZES
+        })
+    
+    def test_kanban_read_group(self):
+        Request = self.env['simple.change.request']
+        self.assertWithinBudgets('kanban read_group', {
+            size: self._measure(lambda: Request.read_group(
+                [('id', 'in', self.slices[size].ids)], ['total_effort_days:sum'], ['state'],
+            ))
+            for size in SIZES
+        })
+    
+    def test_display_name(self):
+        self.assertWithinBudgets('display_name', {
+            size: self._measure(lambda: self.slices[size].mapped('display_name')) for size in SIZES
+        })
+    
+    # Workflow
+    def test_transitions(self):
+        # draft -> submitted -> rejected -> draft -> submitted -> approved -> completed
+        steps = [
+            'action_submit', 'action_reject', 'action_reset_to_draft',
+            'action_submit', 'action_approve', 'action_complete',
+        ]
+        measures = {}
+        for step in steps:
+            for size in SIZES:
+                measures.setdefault(step, {})[size] = self._measure(getattr(self.slices[size], step))
+        for step, step_measures in measures.items():
+            self.assertWithinBudgets(step, step_measures)
+    
+    # Template contexts
+    def test_iter_template_contexts(self):
+        self.assertWithinBudgets('_iter_template_contexts (records)', {
+            size: self._measure(lambda: list(self.slices[size]._iter_template_contexts())) for size in SIZES
+        })
+        self.assertWithinBudgets('_iter_template_contexts (lines)', {
+            size: self._measure(lambda: list(self.lined[size]._iter_template_contexts())) for size in SIZES
+        })
+    
+    def test_prepare_template_context(self):
+        Wizard = self.env['change.request.export.wizard']
+        self.assertWithinBudgets('_prepare_template_context', {
+            size: self._measure(
+                lambda: Wizard.create({'change_request_id': self.lined[size].id})._prepare_template_context()
+            )
+            for size in SIZES
+        })
+    
+    # Word exports
+    def _make_template(self):
+        from docx import Document
+        
+        document = Document()
+        document.add_heading('{{ change_number }} - {{ project_name }}', 0)
+        document.add_paragraph('{{ requester_name }} {{ priority }}')
+        document.add_paragraph('{{p change_description }}')
+        document.add_paragraph('{%p for line in effort_breakdown %}')
+        document.add_paragraph('{{ line.task_number }} {{ line.expected_task }} {{ line.effort_days }}')
+        document.add_paragraph('{%p endfor %}')
+        output = BytesIO()
+        document.save(output)
+        return self.env['change.request.template'].create({
+            'name': 'Performance template',
+            'template_file': base64.b64encode(output.getvalue()),
+            'template_filename': 'performance.docx',
+        })
+    
+    def test_export_basic_document(self):
+        if not HAS_DOCX:
+            self.skipTest("python-docx is not installed")
+        Wizard = self.env['change.request.export.wizard']
+        self.assertWithinBudgets('basic Word export', {
+            size: self._measure(
+                lambda: Wizard.create({'change_request_id': self.lined[size].id})._export_attachment()
+            )
+            for size in SIZES
+        })
+    
+    def test_export_template_document(self):
+        if not (HAS_DOCX and HAS_DOCXTPL):
+            self.skipTest("python-docx and docxtpl are not installed")
+        template = self._make_template()
+        Wizard = self.env['change.request.export.wizard']
+        self.assertWithinBudgets('template Word export', {
+            size: self._measure(lambda: Wizard.create({
+                'change_request_id': self.lined[size].id,
+                'template_id': template.id,
+            })._export_attachment())
+            for size in SIZES
+        })
+    
+    def test_export_batch(self):
+        if not HAS_DOCX:
+            self.skipTest("python-docx is not installed")
+        Wizard = self.env['change.request.export.wizard']
+        self.assertWithinBudgets('batch Word export', {
+            size: self._measure(lambda: Wizard.create({
+                'export_mode': 'batch',
+                'change_request_ids': [Command.set(self.slices[max(SIZES)][:size].ids)],
+            })._export_attachment())
+            for size in EXPORT_SIZES
+        })
@@ -0,0 +1,31 @@
+# Fields exposed by the read API and the change feed, and those the read API
+# returns when the client selects none
+CHANGE_REQUEST_FIELDS = [
+    'name', 'change_number', 'display_label', 'state', 'priority', 'project_id', 'requester_id',
+    'department', 'request_type', 'change_request_date', 'expected_completion', 'total_effort_days',
+    'problem_statement', 'change_description_text', 'create_date', 'write_date',
+]
+DEFAULT_CHANGE_REQUEST_FIELDS = [
+    'name', 'change_number', 'state', 'priority', 'project_id', 'expected_completion',
+    'total_effort_days', 'write_date',
+]
+EFFORT_LINE_FIELDS = [
+    'change_request_id', 'task_number', 'expected_task', 'effort_days', 'remarks', 'task_category',
+    'write_date',
+]
+
+
+def serialize_record(record, fnames):
+    """JSON values of a record: relations as ids, dates in ISO format"""
+    values = {'id': record.id}
+    for fname in fnames:
+        field = record._fields[fname]
+        value = record[fname]
+        if field.type == 'many2one':
+            value = value.id or None
+        elif field.type in ('date', 'datetime'):
+            value = value.isoformat() if value else None
+        elif value is False and field.type != 'boolean':
+            value = None
+        values[fname] = value
+    return values
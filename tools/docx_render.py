@@ -0,0 +1,161 @@
+import re
+import tempfile
+import zipfile
+
+from docx import Document
+from lxml import etree
+
+from .export_metrics import ExportTimer
+
+# Part of a .docx package holding the document body
+DOCUMENT_PART = 'word/document.xml'
+
+# Placeholders of the raw XML blocks spliced into the document body on save
+BLOCK_MARKER = re.compile('<!--ooxml-block-[0-9]+-->')
+
+# Packages being spliced stay in memory up to this size, then spill to disk
+SPLICE_SPOOL_SIZE = 4 * 1024 * 1024
+
+
+def render_basic_document(context, output, include_effort_breakdown=True, timer=None):
+    """Render a basic Word document from a template context into ``output``"""
+    timer = timer or ExportTimer()
+    with timer.phase('render'):
+        doc, blocks = _build_basic_document(context, include_effort_breakdown)
+
+    # Save the document
+    with timer.phase('save') as phase:
+        start = output.tell()
+        _save_with_blocks(doc, blocks, output)
+        phase['size'] += output.tell() - start
+
+
+def _add_block(doc, blocks, xml):
+    """Append raw WordprocessingML (paragraphs, tables) to the document body.
+
+    Only a placeholder is added to the tree; the XML itself is spliced into
+    the serialized body by _save_with_blocks. Moving a parsed tree into the
+    document instead takes quadratic time in lxml, minutes for big tables.
+    """
+    marker = etree.Comment(f'ooxml-block-{len(blocks)}')
+    body = doc.element.body
+    if body.sectPr is not None:
+        body.sectPr.addprevious(marker)
+    else:
+        body.append(marker)
+    blocks[f'<!--{marker.text}-->'] = getattr(xml, 'xml', xml)
+
+
+def _save_with_blocks(doc, blocks, output):
+    """Save the document into ``output``, splicing in the raw XML blocks in one pass"""
+    if not blocks:
+        doc.save(output)
+        return
+    with tempfile.SpooledTemporaryFile(max_size=SPLICE_SPOOL_SIZE) as package:
+        doc.save(package)
+        package.seek(0)
+        with zipfile.ZipFile(package) as source, \
+                zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                data = source.read(info.filename)
+                if info.filename == DOCUMENT_PART:
+                    data = BLOCK_MARKER.sub(lambda match: blocks[match.group(0)], data.decode()).encode()
+                target.writestr(info, data)
+
+
+def _build_basic_document(context, include_effort_breakdown):
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+    # Create a new document
+    doc = Document()
+    blocks = {}
+
+    # Add title
+    title = doc.add_heading('Change Request', 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    # Add basic information
+    doc.add_heading('Basic Information', level=1)
+
+    # Create a table for basic info
+    table = doc.add_table(rows=1, cols=2)
+    table.style = 'Table Grid'
+    hdr_cells = table.rows[0].cells
+    hdr_cells[0].text = 'Field'
+    hdr_cells[1].text = 'Value'
+
+    # Add basic information rows
+    basic_info = [
+        ('Project Name', context['project_name']),
+        ('Change Number', context['change_number']),
+        ('Change Request Date', context['change_request_date']),
+        ('Requester', context['requester_name']),
+        ('Department', context['department']),
+        ('Request Type', context['request_type']),
+        ('Priority', context['priority']),
+        ('Expected Completion', context['expected_completion']),
+    ]
+
+    for field, value in basic_info:
+        row_cells = table.add_row().cells
+        row_cells[0].text = field
+        row_cells[1].text = value
+
+    # Add problem statement
+    if context['problem_statement']:
+        doc.add_heading('Problem Statement', level=1)
+        doc.add_paragraph(context['problem_statement'])
+
+    # Add change description
+    if context['change_description']:
+        doc.add_heading('Change Description', level=1)
+        # Paragraphs converted from the HTML once, when the description was saved
+        _add_block(doc, blocks, context['change_description'])
+
+    # Add acceptance criteria
+    if context['acceptance_criteria']:
+        doc.add_heading('Acceptance Criteria', level=1)
+        doc.add_paragraph(context['acceptance_criteria'])
+
+    # Add reason and benefits
+    if context['reason_for_change'] or context['benefits_of_change']:
+        doc.add_heading('Reason and Benefits', level=1)
+        if context['reason_for_change']:
+            doc.add_heading('Reason for Change', level=2)
+            doc.add_paragraph(context['reason_for_change'])
+        if context['benefits_of_change']:
+            doc.add_heading('Benefits of Change', level=2)
+            doc.add_paragraph(context['benefits_of_change'])
+
+    # Add schedule and cost
+    if context['delivery_timeline'] or context['cost_estimation']:
+        doc.add_heading('Schedule and Cost', level=1)
+        if context['delivery_timeline']:
+            doc.add_heading('Delivery Timeline', level=2)
+            doc.add_paragraph(context['delivery_timeline'])
+        if context['cost_estimation']:
+            doc.add_heading('Cost Estimation', level=2)
+            doc.add_paragraph(context['cost_estimation'])
+
+    # Add assumptions and payment
+    if context['assumptions'] or context['payment_milestones']:
+        doc.add_heading('Assumptions and Payment', level=1)
+        if context['assumptions']:
+            doc.add_heading('Assumptions', level=2)
+            doc.add_paragraph(context['assumptions'])
+        if context['payment_milestones']:
+            doc.add_heading('Payment Milestones', level=2)
+            doc.add_paragraph(context['payment_milestones'])
+
+    # Add effort breakdown if requested
+    if include_effort_breakdown and context.get('effort_table'):
+        doc.add_heading('Effort Breakdown', level=1)
+
+        # Effort breakdown table, written as XML in one pass with the
+        # context: adding rows through python-docx gets slower with every row
+        _add_block(doc, blocks, context['effort_table'])
+
+        # Add total effort
+        doc.add_paragraph(f"Total Effort: {context['total_effort_days']} days")
+
+    return doc, blocks
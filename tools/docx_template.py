@@ -0,0 +1,115 @@
+"""Mail merge of uploaded .docx templates with docxtpl.
+
+Only the template export backend imports this module: the basic export
+never loads docxtpl and jinja2.
+"""
+import re
+import zipfile
+from io import BytesIO
+
+from docx import Document
+from docx.oxml import parse_xml
+from docxtpl import DocxTemplate
+from lxml import etree
+
+from .export_metrics import ExportTimer
+from .template_cache import template_cache
+
+# Parsed XML trees weigh several times the size of the XML they come from
+XML_MEMORY_FACTOR = 4
+
+# Paragraph boundaries and variables printed by the patched XML of a template
+TEMPLATE_XML_TOKEN = re.compile(r'<w:p[ >]|</w:p>|\{\{-?\s*(\w+)')
+
+
+class _Template(DocxTemplate):
+    """docxtpl template installing its rendered body in linear time"""
+
+    def map_tree(self, tree):
+        # DocxTemplate moves the rendered body into the document tree, which
+        # lxml does in quadratic time (minutes for tables of thousands of
+        # rows): rebuild the whole document element in a single parse instead
+        part = self.docx.part
+        root = part.element
+        root.body.addprevious(etree.Comment('ooxml-body'))
+        root.remove(root.body)
+        xml = etree.tostring(root, encoding='unicode').replace(
+            '<!--ooxml-body-->', etree.tostring(tree, encoding='unicode'), 1,
+        )
+        part._element = parse_xml(xml)
+        self.docx = part.document
+
+
+def parse_template(template_data):
+    """Parse a .docx template, return the document with its estimated memory footprint"""
+    with zipfile.ZipFile(BytesIO(template_data)) as package:
+        xml_size = sum(info.file_size for info in package.infolist() if info.filename.endswith('.xml'))
+    document = Document(BytesIO(template_data))
+    return document, len(template_data) + xml_size * XML_MEMORY_FACTOR
+
+
+def load_template(template_data, checksum=None, timer=None):
+    """Return a template ready to render.
+
+    ``template_data`` is either the template bytes or a callable returning
+    them; with a ``checksum`` the parsed template comes from the per-process
+    cache, so the data is only produced and parsed on a cache miss.
+    """
+    timer = timer or ExportTimer()
+
+    def _load():
+        with timer.phase('decode') as phase:
+            data = template_data() if callable(template_data) else template_data
+            phase['size'] += len(data)
+        with timer.phase('parse'):
+            return parse_template(data)
+
+    # The template keeps no reference to its source: it only renders from
+    # the (possibly cached) parsed document
+    template = _Template(None)
+    with timer.phase('template_copy'):
+        template.docx = template_cache.get(checksum, _load) if checksum else _load()[0]
+    return template
+
+
+def template_variables(template_data):
+    """Names of the variables a .docx template expects from its context"""
+    return set(DocxTemplate(BytesIO(template_data)).get_undeclared_template_variables())
+
+
+def inline_variables(template_data, names):
+    """Those of ``names`` a .docx template prints within a paragraph (inline
+    ``{{ name }}`` or run ``{{r name}}`` tags) instead of in place of a whole
+    paragraph through a ``{{p name}}`` tag"""
+    template = DocxTemplate(BytesIO(template_data))
+    template.init_docx()
+    xmls = [template.get_xml()] + [
+        template.get_part_xml(part)
+        for uri in (template.HEADER_URI, template.FOOTER_URI)
+        for _rel_key, part in template.get_headers_footers(uri)
+    ]
+    inline = set()
+    for xml in xmls:
+        # Paragraph tags replace their paragraph: they end up outside any
+        depth = 0
+        for match in TEMPLATE_XML_TOKEN.finditer(template.patch_xml(xml)):
+            if match.group(1) is not None:
+                if depth and match.group(1) in names:
+                    inline.add(match.group(1))
+            elif match.group(0) == '</w:p>':
+                depth -= 1
+            else:
+                depth += 1
+    return inline
+
+
+def render_template_document(template_data, context, output, checksum=None, timer=None):
+    """Render a docxtpl template with the given context into ``output``"""
+    timer = timer or ExportTimer()
+    doc = load_template(template_data, checksum, timer)
+    with timer.phase('render'):
+        doc.render(context)
+    with timer.phase('save') as phase:
+        start = output.tell()
+        doc.save(output)
+        phase['size'] += output.tell() - start
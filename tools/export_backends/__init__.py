@@ -0,0 +1,47 @@
+"""Registry of the export engines.
+
+Backends are registered by dotted path and imported on first use, so that
+python-docx, docxtpl and their dependencies (jinja2, ...) are only loaded by
+the processes actually exporting, and a missing library only disables the
+export instead of the whole module.
+"""
+import importlib
+
+from .base import ExportBackend, default_worker_count, render_documents, spooled_output
+
+# Backend name -> 'module:class', relative to this package
+BACKENDS = {
+    'basic': '.basic:BasicWordBackend',
+    'template': '.template:TemplateWordBackend',
+}
+
+# Distribution to install for the importable modules the backends need
+PIP_PACKAGES = {
+    'docx': 'python-docx',
+    'docxtpl': 'docxtpl',
+}
+
+
+class ExportBackendUnavailable(ImportError):
+    """The library an export backend needs isn't installed"""
+
+
+def register_backend(name, path):
+    """Register (or replace) the backend ``name``, implemented by the class
+    at ``path`` ('package.module:Class', or relative to this package)"""
+    BACKENDS[name] = path
+
+
+def get_backend(name):
+    """Class of the backend ``name``, importing its module if needed"""
+    if name not in BACKENDS:
+        raise KeyError(f"Unknown export backend: {name}")
+    module_name, class_name = BACKENDS[name].split(':')
+    try:
+        module = importlib.import_module(module_name, __name__)
+    except ImportError as e:
+        missing = e.name.split('.')[0] if e.name else str(e)
+        raise ExportBackendUnavailable(
+            f"The {name} export needs the {missing} library: pip install {PIP_PACKAGES.get(missing, missing)}"
+        ) from e
+    return getattr(module, class_name)
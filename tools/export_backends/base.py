@@ -0,0 +1,119 @@
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import get_context
+
+from ..export_metrics import ExportTimer
+
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# Rendered documents stay in memory up to this size, then spill to disk
+SPOOL_MAX_SIZE = 1024 * 1024
+
+# Contexts handed to the rendering pool ahead of the documents, per worker
+IN_FLIGHT_PER_WORKER = 2
+
+# Backend shared by every task of a pool worker (set by _init_worker)
+_worker_backend = None
+
+
+class ExportBackend:
+    """Export engine rendering one document per template context.
+
+    Backends are configured at instantiation and must stay picklable: batch
+    exports ship them once to each worker of the rendering pool. Their module
+    is only imported when the backend is first requested from the registry,
+    so the libraries they use are never loaded by processes that don't export.
+    """
+    name = None
+    extension = 'docx'
+    mimetype = DOCX_MIMETYPE
+
+    def __init__(self, include_effort_breakdown=True):
+        self.include_effort_breakdown = include_effort_breakdown
+
+    def render(self, context, output, timer):
+        """Render the document of a template context into the binary file ``output``"""
+        raise NotImplementedError()
+
+
+def spooled_output():
+    """Temporary binary file receiving a rendered document"""
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+
+
+def default_worker_count():
+    """Default size of the rendering pool"""
+    return min(4, os.cpu_count() or 1)
+
+
+def _init_worker(backend):
+    """Pool initializer: ship the backend (and its template) once per worker instead of per task"""
+    global _worker_backend
+    _worker_backend = backend
+
+
+def _render_in_worker(context):
+    """Render into a temporary file and return its path with the phase
+    timings: only those travel back to the parent process, never the
+    document itself"""
+    timer = ExportTimer()
+    with tempfile.NamedTemporaryFile(suffix=f'.{_worker_backend.extension}', delete=False) as output:
+        try:
+            _worker_backend.render(context, output, timer)
+        except Exception:
+            os.unlink(output.name)
+            raise
+    return output.name, timer.phases
+
+
+def render_documents(backend, contexts, max_workers=1, timer=None):
+    """Render one document per context with ``backend``, yielding them in input order.
+
+    Each document is yielded as a binary file object positioned at its start,
+    valid until the next one is requested. The contexts are consumed lazily:
+    with more than one worker the documents are rendered in a forked process
+    pool, which is only handed IN_FLIGHT_PER_WORKER contexts per worker
+    ahead of the document being yielded. The contexts are plain dicts, so
+    children never touch the database. The rendering phases of all
+    documents are accumulated in ``timer``.
+    """
+    timer = timer or ExportTimer()
+    contexts = iter(contexts)
+
+    if max_workers <= 1:
+        for context in contexts:
+            with spooled_output() as output:
+                backend.render(context, output, timer)
+                output.seek(0)
+                yield output
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=get_context('fork'),
+        initializer=_init_worker,
+        initargs=(backend,),
+    ) as executor:
+        pending = deque(
+            executor.submit(_render_in_worker, context)
+            for context in islice(contexts, max_workers * IN_FLIGHT_PER_WORKER)
+        )
+        try:
+            while pending:
+                path, phases = pending.popleft().result()
+                for context in islice(contexts, 1):
+                    pending.append(executor.submit(_render_in_worker, context))
+                timer.merge(phases)
+                try:
+                    with open(path, 'rb') as document:
+                        yield document
+                finally:
+                    os.unlink(path)
+        finally:
+            # Export aborted: drop the documents rendered ahead
+            for future in pending:
+                if not future.cancel() and future.exception() is None:
+                    os.unlink(future.result()[0])
@@ -0,0 +1,10 @@
+from .. import docx_render
+from .base import ExportBackend
+
+
+class BasicWordBackend(ExportBackend):
+    """Word document laid out from scratch with python-docx"""
+    name = 'basic'
+
+    def render(self, context, output, timer):
+        docx_render.render_basic_document(context, output, self.include_effort_breakdown, timer)
@@ -0,0 +1,30 @@
+from .. import docx_template
+from .base import ExportBackend
+
+
+class TemplateWordBackend(ExportBackend):
+    """Mail merge of an uploaded .docx template with docxtpl.
+
+    ``template_data`` is either the template bytes or a callable returning
+    them (only called when the template isn't cached yet); batch exports
+    rendering in a process pool need the bytes.
+    """
+    name = 'template'
+
+    def __init__(self, template_data, checksum=None, include_effort_breakdown=True):
+        super().__init__(include_effort_breakdown)
+        self.template_data = template_data
+        self.checksum = checksum
+
+    def render(self, context, output, timer):
+        docx_template.render_template_document(self.template_data, context, output, self.checksum, timer)
+
+    @staticmethod
+    def template_variables(template_data):
+        """Names of the variables a template expects from its context"""
+        return docx_template.template_variables(template_data)
+
+    @staticmethod
+    def inline_variables(template_data, names):
+        """Those of ``names`` a template prints within a paragraph"""
+        return docx_template.inline_variables(template_data, names)
@@ -0,0 +1,63 @@
+import time
+from contextlib import contextmanager
+
+
+class ExportTimer:
+    """Per-phase timing of one export.
+
+    Phases may nest: each phase only accounts for its own time and queries,
+    excluding those of the phases nested in it, so the phase durations of an
+    export add up to its total duration. Query counts come from the database
+    cursor when one is given (pool workers have none).
+    """
+
+    def __init__(self, cr=None):
+        self.cr = cr
+        self.phases = {}
+        self.document_count = 0
+        self.failed_phase = None
+        self._stack = []
+
+    def _query_count(self):
+        return self.cr.sql_log_count if self.cr is not None else 0
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as ``name``; yields the phase entry so the
+        caller can record the ``size`` of the data it handled"""
+        entry = self.phases.setdefault(name, {'duration': 0.0, 'queries': 0, 'size': 0, 'count': 0})
+        frame = {'start': time.perf_counter(), 'queries': self._query_count(), 'nested_duration': 0.0, 'nested_queries': 0}
+        self._stack.append(frame)
+        try:
+            yield entry
+        except Exception:
+            if self.failed_phase is None:
+                self.failed_phase = name
+            raise
+        finally:
+            self._stack.pop()
+            duration = time.perf_counter() - frame['start']
+            queries = self._query_count() - frame['queries']
+            entry['duration'] += duration - frame['nested_duration']
+            entry['queries'] += queries - frame['nested_queries']
+            entry['count'] += 1
+            if self._stack:
+                self._stack[-1]['nested_duration'] += duration
+                self._stack[-1]['nested_queries'] += queries
+
+    def merge(self, phases):
+        """Add phases timed elsewhere (e.g. in a pool worker)"""
+        for name, values in phases.items():
+            entry = self.phases.setdefault(name, {'duration': 0.0, 'queries': 0, 'size': 0, 'count': 0})
+            for key in entry:
+                entry[key] += values[key]
+
+    def summary(self):
+        """Phases as plain dicts, durations in milliseconds"""
+        return [{
+            'phase': name,
+            'duration_ms': round(values['duration'] * 1000, 3),
+            'query_count': values['queries'],
+            'size': values['size'],
+            'count': values['count'],
+        } for name, values in self.phases.items()]
@@ -0,0 +1,265 @@
+import re
+from xml.sax.saxutils import escape
+
+from lxml import html as lxml_html
+
+# Elements starting a new paragraph
+BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'header', 'footer', 'blockquote', 'pre', 'address',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'tr', 'ul', 'ol', 'table', 'dl', 'dt', 'dd', 'hr',
+}
+
+# Elements whose content is never rendered
+SKIPPED_TAGS = {'script', 'style', 'head', 'title', 'img', 'svg', 'object', 'iframe'}
+
+# Run formatting of inline elements
+INLINE_FORMATS = {
+    'b': 'bold', 'strong': 'bold',
+    'i': 'italic', 'em': 'italic', 'cite': 'italic',
+    'u': 'underline', 'ins': 'underline', 'a': 'underline',
+    's': 'strike', 'strike': 'strike', 'del': 'strike',
+    'code': 'code', 'kbd': 'code', 'tt': 'code',
+    'sup': 'superscript', 'sub': 'subscript',
+}
+
+# Run properties, in the order the WordprocessingML schema requires them
+RUN_PROPERTIES = [
+    ('code', '<w:rFonts w:ascii="Courier New" w:hAnsi="Courier New" w:cs="Courier New"/>'),
+    ('bold', '<w:b/>'),
+    ('italic', '<w:i/>'),
+    ('strike', '<w:strike/>'),
+    ('size', '<w:sz w:val="{size}"/><w:szCs w:val="{size}"/>'),
+    ('underline', '<w:u w:val="single"/>'),
+    ('superscript', '<w:vertAlign w:val="superscript"/>'),
+    ('subscript', '<w:vertAlign w:val="subscript"/>'),
+]
+
+# Font size of the headings, in half-points
+HEADING_SIZES = {'h1': 32, 'h2': 28, 'h3': 26, 'h4': 24, 'h5': 22, 'h6': 22}
+
+# Indentation of one list or quote level, in twentieths of a point
+INDENT_STEP = 720
+
+# Characters XML 1.0 does not allow
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+# Runs of a paragraph are (text, formats) pairs; these texts stand for
+# line breaks and cell separators
+LINE_BREAK = '\n'
+TAB = '\t'
+
+
+class _Paragraph:
+    __slots__ = ('indent', 'prefix', 'size', 'runs')
+
+    def __init__(self, indent=0, prefix='', size=None):
+        self.indent = indent
+        self.prefix = prefix
+        self.size = size
+        self.runs = []
+
+
+class _Converter:
+    """Walk an HTML tree into a flat list of paragraphs"""
+
+    def __init__(self):
+        self.paragraphs = []
+        self.current = None
+        self.lists = []
+        self.quote_level = 0
+        self.preformatted = 0
+
+    def convert(self, root):
+        self._walk(root, frozenset(), None)
+        self._close()
+        return [paragraph for paragraph in self.paragraphs if paragraph.runs]
+
+    def _walk(self, node, formats, size):
+        if not isinstance(node.tag, str):
+            # comments and processing instructions: only their tail is text
+            return
+        tag = node.tag.lower()
+        if tag in SKIPPED_TAGS:
+            return
+
+        if tag in INLINE_FORMATS:
+            formats = formats | {INLINE_FORMATS[tag]}
+        if tag in HEADING_SIZES:
+            size = HEADING_SIZES[tag]
+            formats = formats | {'bold'}
+        if tag in ('th', 'dt'):
+            formats = formats | {'bold'}
+
+        if tag in ('ul', 'ol'):
+            self.lists.append([tag == 'ol', 0])
+        elif tag == 'blockquote':
+            self.quote_level += 1
+        elif tag == 'pre':
+            self.preformatted += 1
+
+        if tag == 'br':
+            self._append(LINE_BREAK, formats)
+        elif tag in ('td', 'th') and self.current is not None and self.current.runs:
+            self._append(TAB, formats)
+        elif tag == 'li':
+            self._open_list_item(size)
+        elif tag in BLOCK_TAGS:
+            self._open(size)
+
+        if node.text:
+            self._append_text(node.text, formats, size)
+        for child in node:
+            self._walk(child, formats, size)
+            if child.tail:
+                self._append_text(child.tail, formats, size)
+
+        if tag in ('ul', 'ol'):
+            self.lists.pop()
+        elif tag == 'blockquote':
+            self.quote_level -= 1
+        elif tag == 'pre':
+            self.preformatted -= 1
+        if tag in BLOCK_TAGS:
+            self._close()
+
+    def _indent(self):
+        return (len(self.lists) + self.quote_level) * INDENT_STEP
+
+    def _open(self, size=None):
+        self._close()
+        self.current = _Paragraph(self._indent(), size=size)
+
+    def _open_list_item(self, size=None):
+        self._close()
+        if self.lists:
+            numbered = self.lists[-1]
+            numbered[1] += 1
+            prefix = f"{numbered[1]}." if numbered[0] else '•'
+        else:
+            prefix = '•'
+        self.current = _Paragraph(self._indent(), prefix=prefix, size=size)
+
+    def _close(self):
+        if self.current is not None:
+            # Drop the trailing whitespace and line breaks of the paragraph
+            while self.current.runs and self.current.runs[-1][0] == LINE_BREAK:
+                self.current.runs.pop()
+            if self.current.runs and self.current.runs[-1][0] != TAB:
+                text, formats = self.current.runs[-1]
+                if not self.preformatted:
+                    text = text.rstrip()
+                if text:
+                    self.current.runs[-1] = (text, formats)
+                else:
+                    self.current.runs.pop()
+            self.paragraphs.append(self.current)
+        self.current = None
+
+    def _append_text(self, text, formats, size):
+        text = INVALID_XML_CHARS.sub('', text)
+        if self.preformatted:
+            lines = text.split('\n')
+            for index, line in enumerate(lines):
+                if index:
+                    self._append(LINE_BREAK, formats)
+                if line:
+                    self._append(line, formats)
+            return
+        text = re.sub(r'\s+', ' ', text)
+        if self.current is None:
+            text = text.lstrip()
+            if not text:
+                return
+            self.current = _Paragraph(self._indent(), size=size)
+        elif not self.current.runs or self.current.runs[-1][0] in (LINE_BREAK, TAB) \
+                or self.current.runs[-1][0].endswith(' '):
+            text = text.lstrip()
+        if text:
+            self._append(text, formats)
+
+    def _append(self, text, formats):
+        if self.current is None:
+            if text in (LINE_BREAK, TAB):
+                return
+            self.current = _Paragraph(self._indent())
+        runs = self.current.runs
+        if runs and runs[-1][1] == formats and text not in (LINE_BREAK, TAB) \
+                and runs[-1][0] not in (LINE_BREAK, TAB):
+            runs[-1] = (runs[-1][0] + text, formats)
+        else:
+            runs.append((text, formats))
+
+
+def _parse(html):
+    if not html or not html.strip():
+        return []
+    root = lxml_html.fragment_fromstring(html, create_parent='div')
+    return _Converter().convert(root)
+
+
+def _run_xml(text, formats, size):
+    if size:
+        formats = formats | {'size'}
+    properties = ''.join(xml.format(size=size) for fmt, xml in RUN_PROPERTIES if fmt in formats)
+    properties = f'<w:rPr>{properties}</w:rPr>' if properties else ''
+    if text == LINE_BREAK:
+        return f'<w:r>{properties}<w:br/></w:r>'
+    if text == TAB:
+        return f'<w:r>{properties}<w:tab/></w:r>'
+    return f'<w:r>{properties}<w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+
+
+def _paragraph_xml(paragraph):
+    properties = ''
+    if paragraph.prefix:
+        properties = f'<w:ind w:left="{paragraph.indent}" w:hanging="360"/>'
+    elif paragraph.indent:
+        properties = f'<w:ind w:left="{paragraph.indent}"/>'
+    runs = [_run_xml(text, formats, paragraph.size) for text, formats in paragraph.runs]
+    if paragraph.prefix:
+        runs.insert(0, _run_xml(paragraph.prefix, frozenset(), paragraph.size) + _run_xml(TAB, frozenset(), None))
+    properties = f'<w:pPr>{properties}</w:pPr>' if properties else ''
+    return f'<w:p>{properties}{"".join(runs)}</w:p>'
+
+
+def _paragraph_text(paragraph):
+    text = ''.join(text for text, _formats in paragraph.runs)
+    indent = '  ' * (paragraph.indent // INDENT_STEP - (1 if paragraph.prefix else 0))
+    return f"{indent}{paragraph.prefix} {text}" if paragraph.prefix else f"{indent}{text}"
+
+
+def convert(html):
+    """Convert an HTML fragment to WordprocessingML paragraphs and plain text.
+
+    Return ``(ooxml, text)``: ``ooxml`` is a sequence of ``<w:p>`` elements
+    (``w:`` prefix, no namespace declaration) keeping the paragraphs, headings,
+    lists, line breaks and run formatting of the HTML; ``text`` is its plain
+    text, one line per paragraph. Both are empty strings for an empty input.
+    """
+    paragraphs = _parse(html)
+    return (
+        ''.join(_paragraph_xml(paragraph) for paragraph in paragraphs),
+        '\n'.join(_paragraph_text(paragraph) for paragraph in paragraphs),
+    )
+
+
+class RichParagraphs(str):
+    """Converted paragraphs (or tables) handed to templates as rich text.
+
+    Like docxtpl's ``RichTextParagraph``, it renders as raw WordprocessingML
+    through a ``{{p variable}}`` tag (even with autoescaping); being a plain
+    string it pickles to pool workers and needs no docxtpl import.
+    """
+    __slots__ = ()
+
+    @property
+    def xml(self):
+        return str(self)
+
+    def __html__(self):
+        return str(self)
+
+
+def rich_text(ooxml):
+    """Rich text object inserting converted paragraphs in a template"""
+    return RichParagraphs(ooxml or '')
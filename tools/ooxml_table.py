@@ -0,0 +1,66 @@
+from xml.sax.saxutils import escape
+
+from .html_to_ooxml import INVALID_XML_CHARS
+
+# Columns of the effort breakdown table: (header, width in twentieths of a point)
+EFFORT_COLUMNS = [
+    ('No.', 1000),
+    ('Expected Task', 4400),
+    ('Effort (Days)', 1400),
+    ('Remarks', 2600),
+]
+
+# Single borders on every edge, so the table looks the same in any template
+# (the TableGrid style isn't defined in all of them)
+TABLE_BORDERS = ''.join(
+    f'<w:{edge} w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    for edge in ('top', 'left', 'bottom', 'right', 'insideH', 'insideV')
+)
+
+# Line breaks within a cell text, as python-docx writes them
+LINE_BREAK = '</w:t><w:br/><w:t xml:space="preserve">'
+
+
+def _cell_xml(text, bold=False):
+    text = escape(INVALID_XML_CHARS.sub('', text)) if text else ''
+    if not text:
+        return '<w:tc><w:p/></w:tc>'
+    text = LINE_BREAK.join(text.replace('\r\n', '\n').replace('\r', '\n').split('\n'))
+    properties = '<w:rPr><w:b/></w:rPr>' if bold else ''
+    return f'<w:tc><w:p><w:r>{properties}<w:t xml:space="preserve">{text}</w:t></w:r></w:p></w:tc>'
+
+
+def iter_table_xml(columns, rows):
+    """Yield the WordprocessingML of a table as consecutive chunks.
+
+    ``columns`` are ``(header, width)`` pairs and ``rows`` an iterable of
+    sequences of cell texts. Every row is written once, straight to XML,
+    so the cost is linear in the number of rows. The layout is fixed and
+    the header row repeats on every page.
+    """
+    yield (
+        '<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:w="0" w:type="auto"/>'
+        f'<w:tblBorders>{TABLE_BORDERS}</w:tblBorders><w:tblLayout w:type="fixed"/></w:tblPr>'
+        '<w:tblGrid>'
+    )
+    yield ''.join(f'<w:gridCol w:w="{width}"/>' for _header, width in columns)
+    yield '</w:tblGrid><w:tr><w:trPr><w:tblHeader/></w:trPr>'
+    yield ''.join(_cell_xml(header, bold=True) for header, _width in columns)
+    yield '</w:tr>'
+    for row in rows:
+        yield f'<w:tr>{"".join(_cell_xml(text) for text in row)}</w:tr>'
+    yield '</w:tbl>'
+
+
+def effort_table_xml(lines):
+    """WordprocessingML table of effort breakdown lines (template context dicts)"""
+    rows = (
+        [
+            line['task_number'],
+            line['expected_task'],
+            str(line['effort_days']) if line['effort_days'] else '',
+            line['remarks'],
+        ]
+        for line in lines
+    )
+    return ''.join(iter_table_xml(EFFORT_COLUMNS, rows))
@@ -0,0 +1,66 @@
+import csv
+import io
+from datetime import date
+
+# Mimetype and extension of each register format
+REGISTER_FORMATS = {
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'csv': ('text/csv', 'csv'),
+}
+
+# Rows of an XLSX worksheet, header included: longer registers continue on
+# further sheets
+XLSX_MAX_ROWS = 1048576
+
+
+def write_csv(output, header, rows):
+    """Write the rows as UTF-8 CSV (with a BOM, for spreadsheets) into the
+    binary file ``output``, one at a time; return the number of rows"""
+    text = io.TextIOWrapper(output, encoding='utf-8-sig', newline='')
+    try:
+        writer = csv.writer(text)
+        writer.writerow(header)
+        count = 0
+        for row in rows:
+            writer.writerow(['' if value is None else value.isoformat() if isinstance(value, date) else value
+                             for value in row])
+            count += 1
+        text.flush()
+        return count
+    finally:
+        # Leave ``output`` open for the caller
+        text.detach()
+
+
+def write_xlsx(output, header, rows, sheet_name='Register'):
+    """Write the rows as an XLSX workbook into the binary file ``output``;
+    return the number of rows.
+
+    The workbook is created in openpyxl's write-only mode: rows are
+    serialized to a temporary file as they come, never kept in memory.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    workbook = Workbook(write_only=True)
+    sheet, sheet_rows, count = None, XLSX_MAX_ROWS, 0
+    for row in rows:
+        if sheet_rows == XLSX_MAX_ROWS:
+            number = len(workbook.worksheets) + 1
+            sheet = workbook.create_sheet(sheet_name if number == 1 else f"{sheet_name} ({number})")
+            sheet.append(header)
+            sheet_rows = 1
+        sheet.append([ILLEGAL_CHARACTERS_RE.sub('', value) if isinstance(value, str) else value for value in row])
+        sheet_rows += 1
+        count += 1
+    if sheet is None:
+        workbook.create_sheet(sheet_name).append(header)
+    workbook.save(output)
+    return count
+
+
+def write_register(file_format, output, header, rows):
+    """Write the rows in ``file_format`` ('xlsx' or 'csv') into ``output``"""
+    if file_format == 'xlsx':
+        return write_xlsx(output, header, rows)
+    return write_csv(output, header, rows)
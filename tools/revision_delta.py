@@ -0,0 +1,83 @@
+import difflib
+import json
+import re
+import zlib
+
+# Texts are compared as sequences of tokens: lines, and HTML tags (change
+# descriptions are stored as HTML on a single line)
+TOKEN_BOUNDARY = re.compile(r'(?<=\n)|(?<=>)(?=<)')
+
+# Compression level of the stored payloads
+COMPRESSION_LEVEL = 9
+
+
+def tokenize(text):
+    return [token for token in TOKEN_BOUNDARY.split(text or '') if token]
+
+
+def make_delta(old, new):
+    """Operations rebuilding ``new`` from ``old``: positive integers copy
+    that many tokens of ``old``, negative ones skip them, strings are
+    inserted as is"""
+    old_tokens, new_tokens = tokenize(old), tokenize(new)
+    operations = []
+    matcher = difflib.SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            operations.append(i2 - i1)
+            continue
+        if i2 > i1:
+            operations.append(i1 - i2)
+        if j2 > j1:
+            operations.append(''.join(new_tokens[j1:j2]))
+    return operations
+
+
+def apply_delta(old, operations):
+    """Rebuild a text from its previous version and a delta of make_delta"""
+    old_tokens = tokenize(old)
+    parts, position = [], 0
+    for operation in operations:
+        if isinstance(operation, str):
+            parts.append(operation)
+        elif operation > 0:
+            parts.extend(old_tokens[position:position + operation])
+            position += operation
+        else:
+            position -= operation
+    return ''.join(parts)
+
+
+def encode_keyframe(snapshot):
+    """Compressed payload of a full snapshot ``{name: text}``"""
+    return zlib.compress(json.dumps(snapshot).encode(), COMPRESSION_LEVEL)
+
+
+def encode_delta(old_snapshot, new_snapshot):
+    """Compressed payload of the changes between two snapshots (the texts
+    that didn't change are left out)"""
+    delta = {
+        name: make_delta(old_snapshot.get(name, ''), text)
+        for name, text in new_snapshot.items()
+        if text != old_snapshot.get(name, '')
+    }
+    return zlib.compress(json.dumps(delta).encode(), COMPRESSION_LEVEL)
+
+
+def decode(payload):
+    return json.loads(zlib.decompress(payload))
+
+
+def apply_payload(snapshot, payload, keyframe):
+    """Snapshot following ``snapshot`` given the payload of the next revision"""
+    if keyframe:
+        return decode(payload)
+    snapshot = dict(snapshot)
+    for name, operations in decode(payload).items():
+        snapshot[name] = apply_delta(snapshot.get(name, ''), operations)
+    return snapshot
+
+
+def snapshot_size(snapshot):
+    """Bytes a full, uncompressed copy of the snapshot would take"""
+    return sum(len(text.encode()) for text in snapshot.values())
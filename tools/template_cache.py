@@ -0,0 +1,94 @@
+import copy
+import logging
+import threading
+from collections import OrderedDict
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class TemplateCache:
+    """Per-process LRU cache of parsed Word documents keyed by content checksum.
+
+    The cache keeps one pristine parsed template per checksum and hands out
+    deep copies, since rendering mutates the document in place. Entries are
+    evicted least recently used first once their estimated memory footprint
+    exceeds ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, checksum, loader):
+        """Return a private copy of the template cached under ``checksum``.
+
+        ``loader`` is only called on a miss and must return a tuple
+        ``(parsed_template, estimated_size)``.
+        """
+        with self._lock:
+            entry = self._entries.get(checksum)
+            if entry is not None:
+                self._entries.move_to_end(checksum)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is None:
+            template, size = loader()
+            entry = (template, size)
+            self._store(checksum, entry)
+            _logger.debug("Template cache miss for %s: %s", checksum, self.stats())
+
+        return copy.deepcopy(entry[0])
+
+    def _store(self, checksum, entry):
+        size = entry[1]
+        if size > self.max_bytes:
+            # Never cache a template that alone would blow the budget
+            return
+        with self._lock:
+            if checksum in self._entries:
+                return
+            self._entries[checksum] = entry
+            self._size += size
+            self._evict()
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            _checksum, (_template, size) = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+
+    def resize(self, max_bytes):
+        """Change the memory budget, evicting entries if needed"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        """Drop every cached template"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        """Counters describing the cache efficiency and footprint"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'size': self._size,
+                'max_bytes': self.max_bytes,
+            }
+
+
+template_cache = TemplateCache()